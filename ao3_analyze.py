@@ -1,23 +1,50 @@
 import json
+from array import array
 from collections import Counter, defaultdict
+from collections.abc import Mapping
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 import sys
 import time
 
-def slow_print(text, delay=0.25):
-    print(text)
-    time.sleep(delay)
+from ao3_metrics import PROFILE, Metrics, profiling
+from ao3_snapshot import load_snapshot
+from ao3_tags import TagIndex, load_aliases
+from ao3_timeseries import load_histories, monthly_gain
+
+DATA_FILE = "my_ao3_db.json"  # 和 ao3_fetch 写的是同一个文件
+SERIES_FILE = "my_ao3_series.jsonl"  # watch 模式记录的时间序列，没有就跳过【增长曲线】
+TAG_ALIAS_FILE = "ao3_tag_aliases.json"  # 可选的标签别名表 {"别名": "标准写法"}，合并同一个关系的不同写法
+PRINT_DELAY = 0.25  # 每行输出之间停顿几秒
+INTERACTIVE = True  # False 时不等回车、不问 y/n，一律用默认值 (基准测试用)
+
+idle_seconds = 0.0  # 停顿和等用户输入花掉的时间，统计模块耗时要扣掉
+
+
+def add_idle(since: float):
+    global idle_seconds
+    idle_seconds += time.perf_counter() - since
+
 
-DATA_FILE = "my_ao3_db_2025.json"
+def slow_print(text, delay=None):
+    print(text)
+    delay = PRINT_DELAY if delay is None else delay
+    if delay:
+        t0 = time.perf_counter()
+        time.sleep(delay)
+        add_idle(t0)
 
 
 def wait_next(part_name: str = ""):
     out("\n" * 5)
     tip = f"\n『{part_name}』"
     out("Enter 以继续")
+    if not INTERACTIVE:
+        return
+    t0 = time.perf_counter()
     try:
         input(tip)
+        add_idle(t0)
     except KeyboardInterrupt:
         out("\n中断退出。")
         sys.exit(0)
@@ -28,6 +55,10 @@ def clear_screen():
 
 
 def load_data() -> Optional[Dict[str, Any]]:
+    # 旁边有最新的 .snap 快照就 mmap 打开，作品的字段用到时才读，不用 json.load 整个 DB
+    data = load_snapshot(DATA_FILE)
+    if data is not None:
+        return data
     try:
         with open(DATA_FILE, "r", encoding="utf-8") as f:
             return json.load(f)
@@ -38,9 +69,13 @@ def load_data() -> Optional[Dict[str, Any]]:
 
 def ask_yes_no(prompt: str, default: str = "n") -> bool:
     default = default.lower()
+    if not INTERACTIVE:
+        return default == "y"
     hint = "Y/n" if default == "y" else "y/N"
     while True:
+        t0 = time.perf_counter()
         ans = input(f"{prompt} ({hint})：").strip().lower()
+        add_idle(t0)
         if not ans:
             ans = default
         if ans in ("y", "yes"):
@@ -63,14 +98,6 @@ def safe_list(x) -> List:
     return x if isinstance(x, list) else []
 
 
-def normalize_rel_tag(tag: str) -> str:
-    if not isinstance(tag, str):
-        return ""
-    t = tag.strip()
-    t = t.replace("／", "/").replace(" ", "")
-    return t
-
-
 output_lines: List[str] = []
 def out(text: str = ""):
     slow_print(text)
@@ -82,7 +109,7 @@ def collect_comment_authors_from_tree(tree: Any) -> List[str]:
     authors: List[str] = []
 
     def walk(node: Any):
-        if isinstance(node, dict):
+        if isinstance(node, Mapping):
             v = node.get("user")
             if isinstance(v, str) and v.strip():
                 authors.append(v.strip())
@@ -154,46 +181,96 @@ def top_work_by(key: str, works: List[Dict[str, Any]]):
     return max(valid, key=lambda w: int(w.get(key, 0) or 0))
 
 
-def get_hottest_chapter(work: Dict[str, Any], author: str):
-    counter = Counter()
+def build_engagement(work: Dict[str, Any], author: str) -> Dict[str, Any]:
+    """一篇作品按章节的互动，只扫一遍评论树；数组下标 = 第几章 - 1，和 chapters_detail 对齐
+
+    comments：评论数（不算作者自己的）；commenters：不同的评论者（不算作者和 Guest）；
+    max_depth：这一章评论串最深的回复层数（顶层评论是 0，作者的回复也算一层）。
+    """
+    chapters = safe_list(work.get("chapters_detail"))
+    tree = safe_list(work.get("comments_tree"))
+    n = len(chapters)
+    for c in tree:
+        idx = c.get("chapter_index")
+        if isinstance(idx, int) and idx > n:
+            n = idx
+
+    comments = array("i", [0]) * n
+    max_depth = array("i", [0]) * n
+    users: List[Set[str]] = [set() for _ in range(n)]
+    depth: Dict[Any, int] = {}
+    for c in tree:
+        parent = c.get("parent_id")
+        d = depth.get(parent, -1) + 1 if parent else 0
+        depth[c.get("id")] = d
 
-    for c in safe_list(work.get("comments_tree")):
+        idx = c.get("chapter_index")
+        if not isinstance(idx, int) or idx < 1:
+            continue
+        if d > max_depth[idx - 1]:
+            max_depth[idx - 1] = d
         user = c.get("user")
         if not user or user == author:
             continue
+        comments[idx - 1] += 1
+        if user != "Guest":
+            users[idx - 1].add(user)
+
+    dates = [parse_date(ch.get("publish_date")) for ch in chapters]
+    return {
+        "dates": dates + [None] * (n - len(dates)),
+        "comments": comments,
+        "commenters": array("i", (len(u) for u in users)),
+        "max_depth": max_depth,
+    }
+
+
+def work_engagement(ctx: Dict[str, Any], work: Dict[str, Any]) -> Dict[str, Any]:
+    """用到哪篇才算哪篇的互动数组，算过的留在 ctx["engagement"] 里"""
+    wid = work.get("work_id")
+    eng = ctx["engagement"].get(wid)
+    if eng is None:
+        eng = ctx["engagement"][wid] = build_engagement(work, ctx["username"])
+    return eng
+
+
+def get_hottest_chapter(eng: Dict[str, Any]):
+    comments = eng["comments"]
+    if not comments or max(comments) == 0:
+        return None
+    idx = max(range(len(comments)), key=comments.__getitem__)
+    return f"Chapter {idx + 1}", comments[idx]
 
-        idx = c.get("chapter_index")
-        if idx is not None:
-            counter[idx] += 1
 
-    if not counter:
+def engagement_decay(eng: Dict[str, Any]) -> Optional[Tuple[int, float, float]]:
+    """第一章的评论数、之后各章的平均评论数、两者之比；不到两章或第一章没有评论时返回 None"""
+    comments = eng["comments"]
+    if len(comments) < 2 or comments[0] == 0:
         return None
+    later = sum(comments[1:]) / (len(comments) - 1)
+    return comments[0], later, later / comments[0]
 
-    idx, cnt = counter.most_common(1)[0]
-    name = f"Chapter {idx}"
-    return name, cnt
 
+def comment_rates(eng: Dict[str, Any], until: datetime) -> List[Optional[float]]:
+    """每章发布以来平均每周收到几条评论（后发的章节攒评论的时间短，这样比才公平；不满一周按一周算）"""
+    rates: List[Optional[float]] = []
+    for cnt, d in zip(eng["comments"], eng["dates"]):
+        if d is None:
+            rates.append(None)
+        else:
+            rates.append(cnt * 7 / max(7, (until - d).days))
+    return rates
 
-def main():
-    data = load_data()
-    if not data:
-        return
 
+def prepare_report(data: Dict[str, Any], include_hidden: bool, include_anon: bool) -> Dict[str, Any]:
+    """按用户的选择拆分作品，算好各模块共用的汇总数字"""
     account = data.get("account", {})
     username = account.get("username", "Unknown")
     works = safe_list(data.get("works"))
 
-
     anon_works = [w for w in works if w.get("work_type") == "Anonymous"]
     hidden_works = [w for w in works if w.get("work_type") == "Unrevealed"]
 
-    print("=" * 60)
-    out(f"📊 AO3 年终写作回顾 · {username}")
-    print("=" * 60)
-
-    include_hidden = ask_yes_no("要把【隐藏作品（Unrevealed）】也算进主要统计吗？", default="y")
-    include_anon = ask_yes_no("要把【匿名作品（Anonymous）】也算进主要统计吗？", default="y")
-
     public_works, anon_only, hidden_only = split_works(
         works, include_hidden=include_hidden, include_anon=include_anon
     )
@@ -218,8 +295,43 @@ def main():
         d1, d2 = min(first_pub_dates), max(first_pub_dates)
         span_str = f"从 {d1.strftime('%Y-%m-%d')} 到 {d2.strftime('%Y-%m-%d')}。"
 
-
-    
+    load_aliases(TAG_ALIAS_FILE)
+    return {
+        "data": data,
+        "username": username,
+        "works": works,
+        "anon_works": anon_works,
+        "hidden_works": hidden_works,
+        "include_hidden": include_hidden,
+        "include_anon": include_anon,
+        "public_works": public_works,
+        "serial_public": serial_public,
+        "total_words": total_words,
+        "real_words": real_words,
+        "total_kudos": total_kudos,
+        "total_hits": total_hits,
+        "total_comments": total_comments,
+        "total_subs": total_subs,
+        "total_bookmarks": total_bookmarks,
+        "span_str": span_str,
+        "series": load_histories(SERIES_FILE),
+        "engagement": {},  # work_id -> build_engagement(...)，用 work_engagement 按需算
+        "tags": TagIndex.build(public_works),
+        "as_of": parse_date((account.get("fetch_time") or "")[:10]) or datetime.now(),
+    }
+
+
+def section_overview(ctx: Dict[str, Any]):
+    """这一年你写了什么"""
+    public_works = ctx["public_works"]
+    total_words = ctx["total_words"]
+    real_words = ctx["real_words"]
+    total_kudos = ctx["total_kudos"]
+    total_hits = ctx["total_hits"]
+    total_comments = ctx["total_comments"]
+    total_subs = ctx["total_subs"]
+    total_bookmarks = ctx["total_bookmarks"]
+    span_str = ctx["span_str"]
 
     wait_next("初始选项")
     clear_screen()
@@ -233,6 +345,11 @@ def main():
     out("\n\n** ps: AO3的字数统计没有计入中文标点，实际字数比这还多！")
     out(f"按1/10的标点符号计算，你足足写了 {real_words:,} 个字！")
 
+
+def section_highlights(ctx: Dict[str, Any]):
+    """这一年最亮眼的作品"""
+    public_works = ctx["public_works"]
+
     wait_next("最亮眼的是……？")
     clear_screen()
 
@@ -257,6 +374,48 @@ def main():
               f"（{top_cmt_work.get('comments_count')} 条评论）")
         out("这太幸福了！")
 
+
+def section_growth(ctx: Dict[str, Any]):
+    """增长曲线（需要 watch 模式攒下的时间序列）"""
+    series = ctx["series"]
+    if not series:
+        return
+
+    month_total: Counter = Counter()
+    takeoffs = []
+    for w in ctx["public_works"]:
+        gains = monthly_gain(series.get(w.get("work_id"), []), "kudos")
+        if not gains:
+            continue
+        month_total.update(gains)
+        month, gain = max(gains.items(), key=lambda x: x[1])
+        if gain > 0:
+            takeoffs.append((gain, month, w.get("title", "（无标题）")))
+    if not month_total:
+        return
+
+    def month_label(m: str) -> str:
+        y, mo = m.split("-")
+        return f"{y}年{int(mo)}月"
+
+    wait_next("它是什么时候火起来的？")
+    clear_screen()
+
+    out("\n\n【增长曲线】")
+    best_month, best_gain = month_total.most_common(1)[0]
+    out(f"在监测到的日子里，你涨赞最多的是 {month_label(best_month)}，一个月收到了 {best_gain} 个新的赞！")
+    takeoffs.sort(reverse=True)
+    if takeoffs:
+        out("\n起飞时刻：")
+        for gain, month, title in takeoffs[:3]:
+            out(f"  · 《{title}》在 {month_label(month)} 涨了 {gain} 个赞")
+        out("\n>> 原来那个月，有这么多人同时爱上了它。")
+
+
+def section_tastes(ctx: Dict[str, Any]):
+    """分级口味 & Category"""
+    public_works = ctx["public_works"]
+
     wait_next("这一年写了什么")
     clear_screen()
 
@@ -319,7 +478,11 @@ def main():
             dominant = True
         if not dominant:
             out("\n>> 你的口味真多元！高雅人士！")
-        
+
+
+def section_rhythm(ctx: Dict[str, Any]):
+    """更新节奏"""
+    public_works = ctx["public_works"]
 
     # 模块 2：写作节奏（按章节发布时间）
     update_dates: List[datetime] = []
@@ -357,6 +520,11 @@ def main():
                 out("女神不要走……我们想你……")
 
 
+def section_serials(ctx: Dict[str, Any]):
+    """连载时刻"""
+    public_works = ctx["public_works"]
+    serial_public = ctx["serial_public"]
+
     # 模块 3：连载与“连载中更新其他篇目”
     if serial_public:
         wait_next("连载时刻")
@@ -390,11 +558,34 @@ def main():
                 out(f"这篇连载累计收获了 {subs} 个订阅、{bms} 个书签。")
             else:
                 out("这是一篇安静但被认真读完的连载。")
-            hot = get_hottest_chapter(w, username)
+            eng = work_engagement(ctx, w)
+            hot = get_hottest_chapter(eng)
             if hot:
                 chapter, count = hot
                 out(f"其中讨论最热烈的是 {chapter}，收获了 {count} 条评论！噢耶！")
 
+                rates = comment_rates(eng, ctx["as_of"])
+                known = [(r, i) for i, r in enumerate(rates) if r is not None]
+                if known:
+                    rate, i = max(known)
+                    if f"Chapter {i + 1}" != chapter and rate > 0:
+                        out(f"按发布以来的时间算，评论来得最快的是 Chapter {i + 1}（平均每周 {rate:.1f} 条）。")
+
+            decay = engagement_decay(eng)
+            if decay:
+                first, later, ratio = decay
+                if ratio > 1:
+                    out(f"后面的章节平均每章 {later:.1f} 条评论，比第一章（{first} 条）还热闹，越写越火！")
+                elif ratio == 1:
+                    out(f"从第一章到最后，平均每章都稳稳地收到 {first} 条评论，读者一路都在！")
+                else:
+                    out(f"第一章收到 {first} 条评论，之后平均每章 {later:.1f} 条（约为第一章的 {ratio:.0%}）。")
+
+            depth = eng["max_depth"]
+            if depth and max(depth) >= 3:
+                i = max(range(len(depth)), key=depth.__getitem__)
+                out(f"聊得最深的是 Chapter {i + 1} 底下的评论串，来来回回回复了 {depth[i]} 层！")
+
 
             if overlapping_titles:
                 sample = title_list_preview(overlapping_titles, max_show=3)
@@ -405,53 +596,60 @@ def main():
                 out("读者们都泪流满面了！")
             wait_next(" >>> ")
             clear_screen()
-            
 
-    # # === 插入位置：在 top_cmt_work 的 if 块之后 ===
-    
-    # # 1. 汇总所有属于系列的作品
-    # series_map = defaultdict(list)
-    # for w in public_works:
-    #     s_name = w.get("series_name")
-    #     if s_name:
-    #         series_map[s_name].append(w)
-
-    # if series_map:
-    #     wait_next("series")
-    #     clear_screen()
-
-    #     out("\n\n【你的系列宇宙】")
-    #     out(f"这一年，你建设了 {len(series_map)} 个series！")
-    #     for s_name, s_works in series_map.items():
-    #         # 按 series_part 排序 (Part 1, Part 2...)
-    #         s_works.sort(key=lambda x: x.get("series_part") or "")
-    #         titles = [f"《{w['title']}》({w.get('series_part', '??')})" for w in s_works]
-    #         out(f"\n· 系列《{s_name}》：")
-    #         out(f"  包含 {len(titles)} 篇作品：{' 、 '.join(titles)}")
-        
-    #     # 如果 fetch 阶段抓到了 series_list 的汇总数据
-    #     all_series_stats = safe_list(data.get("series_list"))
-    #     if all_series_stats:
-    #         top_s = max(all_series_stats, key=lambda x: x.get("bookmarks", 0))
-    #         out(f"\n在你的所有系列中，最受瞩目的是《{top_s['title']}》，")
-    #         out(f"它已累计获得了 {top_s['bookmarks']} 个bookmark！噢耶！")
-
-    # 合集真的适合统计吗 还是先不统计了谢谢！
-    # out("\n\n【合集印记】")
-    # # 2. 统计合集收录情况
-    # all_collections = []
-    # for w in public_works:
-    #     all_collections.extend(safe_list(w.get("collections_info")))
-    
-    # if not all_collections:
-    #     out("这一年的作品暂时还没有被收录进任何公开合集中。")
-    # else:
-    #     col_counts = Counter(all_collections)
-    #     out(f"你的作品这一年出现在了 {len(col_counts)} 个不同的合集中。")
-    #     out("被收录次数最多的合集是：")
-    #     for name, count in col_counts.most_common(3):
-    #         out(f"  - {name} ({count} 次)")
-    #     out("\n>> 谢谢这些合集主，把你的文字妥善珍藏。")
+
+def section_discussion(ctx: Dict[str, Any]):
+    """系列、合集与讨论密度"""
+    data = ctx["data"]
+    public_works = ctx["public_works"]
+    total_kudos = ctx["total_kudos"]
+    total_comments = ctx["total_comments"]
+
+    # 系列和合集：fetch 从作品列表、系列列表和 collection_items 页一次性汇总，对回到每篇作品上
+    # 1. 汇总所有属于系列的作品
+    series_map = defaultdict(list)
+    for w in public_works:
+        s_name = w.get("series_name")
+        if s_name:
+            series_map[s_name].append(w)
+
+    if series_map:
+        wait_next("series")
+        clear_screen()
+
+        out("\n\n【你的系列宇宙】")
+        out(f"这一年，你建设了 {len(series_map)} 个series！")
+        for s_name, s_works in series_map.items():
+            # 按 series_part 排序 (Part 1, Part 2...)
+            s_works.sort(key=lambda x: x.get("series_part") or 0)
+            titles = [f"《{w.get('title', '（无标题）')}》(Part {w.get('series_part') or '??'})" for w in s_works]
+            out(f"\n· 系列《{s_name}》：")
+            out(f"  包含 {len(titles)} 篇作品：{' 、 '.join(titles)}")
+
+        # fetch 阶段抓到的 series_list 汇总数据
+        all_series_stats = safe_list(data.get("series_list"))
+        if all_series_stats:
+            top_s = max(all_series_stats, key=lambda x: x.get("bookmarks", 0))
+            if top_s.get("bookmarks", 0) > 0:
+                out(f"\n在你的所有系列中，最受瞩目的是《{top_s.get('title', '（无标题）')}》，")
+                out(f"它已累计获得了 {top_s['bookmarks']} 个bookmark！噢耶！")
+
+    # 2. 统计合集收录情况 (旧数据没有 collections_info 时整段跳过)
+    if any("collections_info" in w for w in public_works):
+        out("\n\n【合集印记】")
+        all_collections = []
+        for w in public_works:
+            all_collections.extend(safe_list(w.get("collections_info")))
+
+        if not all_collections:
+            out("这一年的作品暂时还没有被收录进任何公开合集中。")
+        else:
+            col_counts = Counter(all_collections)
+            out(f"你的作品这一年出现在了 {len(col_counts)} 个不同的合集中。")
+            out("被收录次数最多的合集是：")
+            for name, count in col_counts.most_common(3):
+                out(f"  - {name} ({count} 次)")
+            out("\n>> 谢谢这些合集主，把你的文字妥善珍藏。")
 
 
     # 模块 4：互动密度（评论/赞）——你要求用“每个赞对应多少评论”
@@ -469,6 +667,14 @@ def main():
     wait_next("♪谁是我最爱的人")
     clear_screen()
 
+
+def section_readers(ctx: Dict[str, Any]):
+    """读者榜（Kudos / Comments）"""
+    username = ctx["username"]
+    works = ctx["works"]
+    include_hidden = ctx["include_hidden"]
+    include_anon = ctx["include_anon"]
+
     # 模块 5：读者榜（Kudos / Comments）
     # 5.1 Kudos 榜：统计“点过你多少篇作品”
     kudos_user_to_titles: Dict[str, Set[str]] = defaultdict(set)
@@ -547,53 +753,52 @@ def main():
     clear_screen()
 
 
+def section_tags(ctx: Dict[str, Any]):
+    """题材与标签倾向"""
+    tags = ctx["tags"]
 
     # 模块 6：题材与标签倾向（fandom / relationship / freeform）
-    fandom_counts = Counter()
-    rel_counts_raw = Counter()
-    rel_counts_norm = Counter()
-    freeform_counts = Counter()
-
-    for w in public_works:
-        for f in safe_list(w.get("fandoms")):
-            if isinstance(f, str) and f.strip():
-                fandom_counts[f.strip()] += 1
-
-        for r in safe_list(w.get("relationships")):
-            if isinstance(r, str) and r.strip():
-                rel_counts_raw[r.strip()] += 1
-                rel_counts_norm[normalize_rel_tag(r)] += 1
-
-        for t in safe_list(w.get("freeform_tags")):
-            if isinstance(t, str) and t.strip():
-                freeform_counts[t.strip()] += 1
+    # 关系标签已在 TagIndex 里合并了 A/B 与 B/A、全角斜杠和别名表里的写法
+    fandom_counts = Counter(dict(tags.top("fandoms", None)))
+    rel_counts = Counter(dict(tags.top("relationships", None)))
+    freeform_counts = Counter(dict(tags.top("freeform_tags", None)))
 
     if fandom_counts:
         top_fandom, cnt = fandom_counts.most_common(1)[0]
         out("\n\n【你常驻的世界】")
         out(f"这一年你主要写的是 {top_fandom}（出现在 {cnt} 篇作品里）。")
 
-    if rel_counts_raw:
+    if rel_counts:
         out("\n\n【你写的关系走向】")
-        total_rel_tags = sum(rel_counts_raw.values())
-        unique_rel_tags = len(rel_counts_raw)
-
-        if unique_rel_tags == total_rel_tags:
+        if all(c == 1 for c in rel_counts.values()):
             out("玩得真花！你几乎没有写过重复的关系/产品！")
         else:
-            common = rel_counts_raw.most_common(5)
+            common = rel_counts.most_common(5)
             out("长情的作者啊，你最爱吃这些产品：")
             for r, c in common:
                 out(f"  - {r}（{c} 次）")
 
-        # 你要的解释：可能重复
-        
-        out("\n因为 AO3 的 CP/关系标签存在别名、顺序差异、中英混写、全角斜杠等原因，")
-        out("同一个关系可能会出现“重复”的条目，滑跪TAT")
+        merged = tags.merged("relationships")
+        if merged:
+            out("\n（同一对的不同写法已经算在一起了，比如 " + "、".join(f"“{s}”" for s in merged[0][1][:3]) + "）")
 
         wait_next(" 高雅品味 ")
         clear_screen()
 
+    together = tags.always_together(kinds=("relationships", "freeform_tags"))
+    pairs = together or tags.top_pairs(3, kinds=("relationships", "freeform_tags"))
+    if pairs:
+        out("\n\n【形影不离的标签】")
+        if together:
+            out("这几组 tag 你一用就是一起用：")
+        else:
+            out("这几组 tag 你最常放在一起：")
+        for a, b, c in pairs[:3]:
+            out(f"  - {a} + {b}（{c} 篇）")
+        groups = [g for g in tags.clusters(kinds=("relationships", "freeform_tags")) if len(g) > 2]
+        if groups:
+            out(f"\n你还有一套固定搭配：{'、'.join(groups[0][:4])}" + ("……" if len(groups[0]) > 4 else ""))
+
     if freeform_counts:
         out("\n\n【你偏爱的主题与口味】")
         if all(c == 1 for c in freeform_counts.values()):
@@ -615,6 +820,12 @@ def main():
     wait_next("how will you be next ..?")
     clear_screen()
 
+
+def section_secret(ctx: Dict[str, Any]):
+    """匿名 / 隐藏作品小节"""
+    anon_works = ctx["anon_works"]
+    hidden_works = ctx["hidden_works"]
+
     # 你要的：如果不纳入匿名/隐藏，单独开小节做分析
     if anon_works:
         out("\n\n【嘘，偷偷的……】")
@@ -642,6 +853,48 @@ def main():
         out(f"\n隐藏作品合计：{hidden_words:,} 字，{hidden_kudos} 赞，{hidden_comments} 评论，{hidden_hits} 点击。")
         out(f">> 哪天我们会与它们相见呢？")
         wait_next("how will you be next..?")
+
+
+# 报告的各个模块，按顺序输出（基准测试也按这个列表逐个计时）
+REPORT_SECTIONS = [
+    ("overview", section_overview),
+    ("highlights", section_highlights),
+    ("growth", section_growth),
+    ("tastes", section_tastes),
+    ("rhythm", section_rhythm),
+    ("serials", section_serials),
+    ("discussion", section_discussion),
+    ("readers", section_readers),
+    ("tags", section_tags),
+    ("secret", section_secret),
+]
+
+
+def run_report(metrics: Metrics) -> bool:
+    metrics.begin("load")
+    data = load_data()
+    metrics.end()
+    if not data:
+        return False
+
+    username = data.get("account", {}).get("username", "Unknown")
+
+    print("=" * 60)
+    out(f"📊 AO3 年终写作回顾 · {username}")
+    print("=" * 60)
+
+    include_hidden = ask_yes_no("要把【隐藏作品（Unrevealed）】也算进主要统计吗？", default="y")
+    include_anon = ask_yes_no("要把【匿名作品（Anonymous）】也算进主要统计吗？", default="y")
+
+    metrics.begin("prepare")
+    ctx = prepare_report(data, include_hidden=include_hidden, include_anon=include_anon)
+    metrics.end()
+    for name, section in REPORT_SECTIONS:
+        idle_before = idle_seconds
+        t0 = time.perf_counter()
+        section(ctx)
+        metrics.add_phase(name, time.perf_counter() - t0 - (idle_seconds - idle_before))
+
     out("\n报告结束，谢谢你的存在。")
     print(f"最后的最后……")
     save_txt = ask_yes_no("要把这份年终报告保存成 txt 文件吗？", default="y")
@@ -653,7 +906,19 @@ def main():
 
 
     out("\n" + "=" * 60)
-    
+    metrics.incr("idle_seconds", round(idle_seconds, 2))
+    return True
+
+
+def main():
+    metrics = Metrics("analyze")
+    with profiling(PROFILE, DATA_FILE, metrics.label):
+        done = run_report(metrics)
+    if done:
+        try:
+            metrics.write(DATA_FILE)
+        except OSError:
+            pass
 
 
 if __name__ == "__main__":
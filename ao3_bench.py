@@ -0,0 +1,416 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+try:
+    import psutil  # 可选：统计浏览器子进程在内的峰值内存
+except ImportError:
+    psutil = None
+
+# 性能基准：不碰真 AO3，用 ao3_replay.py 的本地替身服务器测抓取速度。
+#   python ao3_bench.py fetch --works 80 --latency-ms 150
+#   python ao3_bench.py fetch --modes serial,pool --json bench_fetch.json
+#   python ao3_bench.py analyze --works 2000 --save-baseline
+#   python ao3_bench.py analyze --works 2000          (和保存的基线比较，变慢会报 REGRESSION)
+#   python ao3_bench.py analyze --works 2000 --snapshot   (从 .snap 快照读，对比 json.load)
+#   python ao3_bench.py startup                       (冷启动 import 耗时，确认分析路径没有带上重依赖)
+
+BASELINE_FILE = "bench_baseline.json"
+
+# 抓取模式 -> 要覆盖的 ao3_fetch 配置
+FETCH_MODES = {
+    "serial": {"PARSE_WORKERS": 0},  # 解析在主进程，和抓取串行
+    "pool": {},                       # 默认：解析丢给进程池
+}
+
+# 启动测速：入口 -> 不允许被顺带导入的重依赖
+STARTUP_TARGETS = {
+    "ao3report": ("bs4", "playwright"),
+    "ao3_analyze": ("bs4", "playwright"),
+    "ao3_fetch": ("bs4", "playwright"),  # 只在真正抓取/解析时才导入
+}
+
+
+class PeakRSS:
+    """后台线程定期采样内存，记录峰值 (MB)
+
+    有 psutil 时统计本进程 + 所有子进程 (包括 Chromium)；
+    没有时退回 resource 的 ru_maxrss，只算 Python 自己。
+    """
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def sample(self):
+        if psutil is not None:
+            proc = psutil.Process()
+            total = proc.memory_info().rss
+            for child in proc.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            return total / (1024 * 1024)
+        try:
+            import resource
+        except ImportError:
+            return 0.0
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.sample())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.sample())
+
+
+def run_fetch_mode(mode, site_opts, server_opts, keep_delays=False, verbose=False):
+    """对一个抓取模式跑一遍完整的 ao3_fetch.main()，返回测量结果"""
+    import ao3_fetch
+    from ao3_replay import start_server
+
+    server = start_server(**server_opts, **site_opts)
+    tmp = tempfile.mkdtemp(prefix="ao3_bench_")
+    overrides = {
+        "BASE_URL": server.base_url,
+        "DATA_FILE": os.path.join(tmp, "db.json"),
+        "USER_DATA_DIR": os.path.join(tmp, "profile"),
+        "HEADLESS_WHEN_LOGGED_IN": True,
+        "RETRY_LATER_WAIT": 1,
+    }
+    if not keep_delays:
+        overrides.update(WORK_INTERVAL=0, STATS_PAGE_INTERVAL=0, LIST_PAGE_INTERVAL=0, WORK_RETRY_BACKOFF=0)
+    overrides.update(FETCH_MODES[mode])
+    saved = {k: getattr(ao3_fetch, k) for k in overrides}
+    for k, v in overrides.items():
+        setattr(ao3_fetch, k, v)
+
+    log = io.StringIO()
+    try:
+        with PeakRSS() as mem:
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(sys.stdout if verbose else log):
+                ao3_fetch.main()
+            elapsed = time.perf_counter() - t0
+        with open(overrides["DATA_FILE"], encoding="utf-8") as f:
+            n_works = len(json.load(f)["works"])
+    finally:
+        for k, v in saved.items():
+            setattr(ao3_fetch, k, v)
+        server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    served = server.stats()
+    return {
+        "mode": mode,
+        "works": n_works,
+        "seconds": round(elapsed, 2),
+        "works_per_min": round(n_works / elapsed * 60, 1) if elapsed else 0.0,
+        "bytes_per_work": served["bytes_sent"] // max(1, n_works),
+        "requests": served["requests"],
+        "throttled": served["throttled"],
+        "peak_rss_mb": round(mem.peak, 1),
+    }
+
+
+def print_table(rows, columns):
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in columns))
+
+
+def cmd_fetch(args):
+    site_opts = {
+        "works": args.works, "old_works": args.old_works, "seed": args.seed,
+        "comments_per_work": args.comments, "kudos_per_work": args.kudos,
+        "max_chapters": args.max_chapters, "words_per_chapter": args.words_per_chapter,
+    }
+    server_opts = {"latency_ms": args.latency_ms, "rate_429": args.rate_429,
+                   "proceed_every": args.proceed_every}
+    rows = []
+    for mode in args.modes.split(","):
+        mode = mode.strip()
+        if mode not in FETCH_MODES:
+            print(f"❌ 未知模式 {mode}，可选：{', '.join(FETCH_MODES)}")
+            return 2
+        print(f"⏱️ fetch · {mode} ...")
+        rows.append(run_fetch_mode(mode, site_opts, server_opts, args.keep_delays, args.verbose))
+    print()
+    print_table(rows, ["mode", "works", "seconds", "works_per_min", "bytes_per_work",
+                       "requests", "throttled", "peak_rss_mb"])
+    if psutil is None:
+        print("（未安装 psutil：peak_rss_mb 只包含 Python 进程，不含浏览器）")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"fetch": rows, "site": site_opts, "server": server_opts}, f, indent=2)
+    return 0
+
+
+def analyze_steps():
+    """分析报告的每一步：读 DB、准备、各个模块"""
+    import ao3_analyze
+
+    steps = [("load", lambda state: state.update(data=ao3_analyze.load_data()))]
+    steps.append(("prepare", lambda state: state.update(
+        ctx=ao3_analyze.prepare_report(state["data"], include_hidden=True, include_anon=True))))
+    for name, section in ao3_analyze.REPORT_SECTIONS:
+        steps.append((name, lambda state, section=section: section(state["ctx"])))
+    return steps
+
+
+def run_analyze(data_file, repeat=5):
+    """跑 repeat 遍完整报告，每一步取最快的一次；再单独跑一遍 tracemalloc 记峰值内存"""
+    import ao3_analyze
+
+    saved = (ao3_analyze.DATA_FILE, ao3_analyze.PRINT_DELAY, ao3_analyze.INTERACTIVE)
+    ao3_analyze.DATA_FILE, ao3_analyze.PRINT_DELAY, ao3_analyze.INTERACTIVE = data_file, 0, False
+    steps = analyze_steps()
+    timings = {name: float("inf") for name, _ in steps}
+    timings["report"] = float("inf")
+    peaks = {}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeat):
+                ao3_analyze.output_lines.clear()
+                state = {}
+                t_report = time.perf_counter()
+                for name, step in steps:
+                    t0 = time.perf_counter()
+                    step(state)
+                    timings[name] = min(timings[name], time.perf_counter() - t0)
+                timings["report"] = min(timings["report"], time.perf_counter() - t_report)
+
+            ao3_analyze.output_lines.clear()
+            state = {}
+            tracemalloc.start()
+            report_peak = 0
+            for name, step in steps:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                step(state)
+                peak = tracemalloc.get_traced_memory()[1]
+                peaks[name] = (peak - base) / (1024 * 1024)
+                report_peak = max(report_peak, peak)
+            peaks["report"] = report_peak / (1024 * 1024)
+            tracemalloc.stop()
+    finally:
+        ao3_analyze.DATA_FILE, ao3_analyze.PRINT_DELAY, ao3_analyze.INTERACTIVE = saved
+        ao3_analyze.output_lines.clear()
+    return timings, peaks
+
+
+def compare_to_baseline(rows, baseline, tolerance, min_seconds=0.02, min_mb=1.0):
+    """标出比基线慢/胖超过 tolerance 的步骤，返回是否有退化"""
+    regressed = False
+    base_rows = {r["step"]: r for r in baseline.get("analyze", [])}
+    for r in rows:
+        b = base_rows.get(r["step"])
+        r["base_s"] = b["seconds"] if b else "-"
+        r["base_mb"] = b["peak_mb"] if b else "-"
+        r["flag"] = ""
+        if not b:
+            continue
+        slow = r["seconds"] > b["seconds"] * (1 + tolerance) and r["seconds"] - b["seconds"] > min_seconds
+        fat = r["peak_mb"] > b["peak_mb"] * (1 + tolerance) and r["peak_mb"] - b["peak_mb"] > min_mb
+        if slow or fat:
+            r["flag"] = "REGRESSION"
+            regressed = True
+        elif r["seconds"] < b["seconds"] * (1 - tolerance) and b["seconds"] - r["seconds"] > min_seconds:
+            r["flag"] = "faster"
+    return regressed
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path, **sections):
+    """只更新本次测的部分，保留文件里其他子命令的基线"""
+    baseline = load_baseline(path) or {}
+    baseline.update(sections)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+    print(f"💾 基线已保存到 {path}")
+
+
+def cmd_analyze(args):
+    from ao3_synth import make_db
+
+    params = {"works": args.works, "comments_per_work": args.comments, "kudos_per_work": args.kudos,
+              "max_chapters": args.max_chapters, "freeforms": args.freeforms,
+              "relationships": args.relationships, "readers": args.readers, "seed": args.seed}
+    if args.snapshot:
+        params["snapshot"] = True
+    tmp = tempfile.mkdtemp(prefix="ao3_bench_")
+    try:
+        data_file = os.path.join(tmp, "db.json")
+        with open(data_file, "w", encoding="utf-8") as f:
+            json.dump(make_db(**{k: v for k, v in params.items() if k != "snapshot"}), f, ensure_ascii=False)
+        print(f"⏱️ analyze · {args.works} 篇合成作品 ({os.path.getsize(data_file) / 1024 / 1024:.1f} MB)")
+        if args.snapshot:
+            from ao3_snapshot import convert
+            convert(data_file)
+        timings, peaks = run_analyze(data_file, repeat=args.repeat)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    rows = [{"step": name, "seconds": round(t, 4), "peak_mb": round(peaks.get(name, 0.0), 2)}
+            for name, t in timings.items()]
+    regressed = False
+    columns = ["step", "seconds", "peak_mb"]
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    if args.save_baseline:
+        save_baseline(args.baseline, params=params, analyze=rows)
+    elif baseline and "analyze" in baseline:
+        if baseline.get("params") != params:
+            print(f"⚠️ 基线的数据规模和这次不同，比较仅供参考：{baseline.get('params')}")
+        regressed = compare_to_baseline(rows, baseline, args.tolerance)
+        columns += ["base_s", "base_mb", "flag"]
+
+    print()
+    print_table(rows, columns)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": params, "analyze": rows}, f, indent=2)
+    if regressed:
+        print("\n❌ 有步骤比基线明显变慢/占用更多内存")
+        return 1
+    return 0
+
+
+def measure_import(module):
+    """新开一个解释器跑 -X importtime，返回 (模块累计 import 毫秒, 整个进程毫秒, 导入过的模块名)"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=here, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - t0) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    cumulative_ms, imported = 0.0, set()
+    for line in proc.stderr.splitlines():
+        # import time:   self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [x.strip() for x in line[len("import time:"):].split("|")]
+        if not parts[1].isdigit():
+            continue
+        name = parts[2].strip()
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative_ms = int(parts[1]) / 1000
+    return cumulative_ms, wall_ms, imported
+
+
+def cmd_startup(args):
+    rows = []
+    for module, forbidden in STARTUP_TARGETS.items():
+        best = None
+        for _ in range(args.repeat):
+            import_ms, wall_ms, imported = measure_import(module)
+            if best is None or wall_ms < best[1]:
+                best = (import_ms, wall_ms)
+        heavy = sorted(m for m in forbidden if m in imported)
+        rows.append({"entry": module, "import_ms": round(best[0], 1), "wall_ms": round(best[1], 1),
+                     "heavy": ",".join(heavy) or "-", "flag": ""})
+
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    base_rows = {r["entry"]: r for r in (baseline or {}).get("startup", [])}
+    failed = False
+    for r in rows:
+        b = base_rows.get(r["entry"])
+        r["base_ms"] = b["import_ms"] if b else "-"
+        if r["heavy"] != "-":
+            r["flag"] = "HEAVY"
+        elif r["wall_ms"] > args.max_ms:
+            r["flag"] = "SLOW"
+        elif b and r["import_ms"] > b["import_ms"] * (1 + args.tolerance) and r["import_ms"] - b["import_ms"] > 20:
+            r["flag"] = "REGRESSION"
+        failed = failed or bool(r["flag"])
+
+    print_table(rows, ["entry", "import_ms", "wall_ms", "base_ms", "heavy", "flag"])
+    if args.save_baseline:
+        save_baseline(args.baseline, startup=[{k: r[k] for k in ("entry", "import_ms", "wall_ms")} for r in rows])
+    if failed:
+        print(f"\n❌ 启动退化：导入了重依赖 (HEAVY)、超过 {args.max_ms}ms (SLOW) 或比基线明显变慢")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="AO3 年度总结 · 性能基准")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    fp = sub.add_parser("fetch", help="用本地替身服务器测 ao3_fetch 的吞吐")
+    fp.add_argument("--modes", default="serial,pool", help=f"逗号分隔：{','.join(FETCH_MODES)}")
+    fp.add_argument("--works", type=int, default=40)
+    fp.add_argument("--old-works", type=int, default=3)
+    fp.add_argument("--comments", type=int, default=30)
+    fp.add_argument("--kudos", type=int, default=60)
+    fp.add_argument("--max-chapters", type=int, default=12)
+    fp.add_argument("--words-per-chapter", type=int, default=2000)
+    fp.add_argument("--latency-ms", type=int, default=150)
+    fp.add_argument("--rate-429", type=float, default=0.0)
+    fp.add_argument("--proceed-every", type=int, default=0)
+    fp.add_argument("--seed", type=int, default=2025)
+    fp.add_argument("--keep-delays", action="store_true", help="保留抓取里的礼貌等待 (默认去掉，只测机制本身)")
+    fp.add_argument("--verbose", action="store_true", help="显示抓取过程的输出")
+    fp.add_argument("--json", default=None, help="把结果另存为 JSON")
+    fp.set_defaults(func=cmd_fetch)
+
+    ap_ = sub.add_parser("analyze", help="用合成 DB 给 ao3_analyze 各模块计时")
+    ap_.add_argument("--works", type=int, default=1000)
+    ap_.add_argument("--comments", type=int, default=40)
+    ap_.add_argument("--kudos", type=int, default=80)
+    ap_.add_argument("--max-chapters", type=int, default=20)
+    ap_.add_argument("--freeforms", type=int, default=120)
+    ap_.add_argument("--relationships", type=int, default=30)
+    ap_.add_argument("--readers", type=int, default=500)
+    ap_.add_argument("--seed", type=int, default=2025)
+    ap_.add_argument("--snapshot", action="store_true", help="先转成 .snap 快照，测从快照读的报告")
+    ap_.add_argument("--repeat", type=int, default=5, help="每步取几次里最快的")
+    ap_.add_argument("--baseline", default=BASELINE_FILE)
+    ap_.add_argument("--save-baseline", action="store_true", help="把这次结果存为基线")
+    ap_.add_argument("--tolerance", type=float, default=0.3, help="超过基线多少比例算退化")
+    ap_.add_argument("--json", default=None)
+    ap_.set_defaults(func=cmd_analyze)
+
+    sp = sub.add_parser("startup", help="用 -X importtime 测冷启动，检查有没有提前导入 Playwright/bs4")
+    sp.add_argument("--repeat", type=int, default=3, help="每个入口跑几次取最快的")
+    sp.add_argument("--max-ms", type=float, default=500, help="新开解释器到 import 完成的上限 (毫秒)")
+    sp.add_argument("--baseline", default=BASELINE_FILE)
+    sp.add_argument("--save-baseline", action="store_true")
+    sp.add_argument("--tolerance", type=float, default=0.5)
+    sp.set_defaults(func=cmd_startup)
+
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
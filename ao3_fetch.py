@@ -1,16 +1,45 @@
 import json
+import multiprocessing
+import os
 import re
+import sys
 import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from ao3_metrics import PROFILE, Metrics, profiling, progress, timed_call
+from ao3_snapshot import snapshot_path, write_snapshot
 
-# from tqdm import tqdm  <-- 把这行注释掉
-def tqdm(iterable, **kwargs): return iterable # <-- 加上这一行，这就叫“假进度条”
+try:
+    import psutil  # 可选：用来统计浏览器渲染进程内存
+except ImportError:
+    psutil = None
 
 # ================= 配置区 =================
+BASE_URL = os.environ.get("AO3_BASE_URL", "https://archiveofourown.org")  # 测试时可指向本地回放服务器
 DATA_FILE = "my_ao3_db.json"
+SERIES_FILE = "my_ao3_series.jsonl"  # watch 模式追加记录的计数时间序列
 USER_DATA_DIR = "chrome_user_data"
+TARGET_YEAR = 2025  # 只统计这一年及以后更新的作品
+LIST_PAGE_INTERVAL = 2  # 作品列表翻页：两次请求之间至少隔几秒 (两个列表共用)
+PARSE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))  # 解析用的进程数，0 = 不开进程池，直接在主进程解析
+PARSE_QUEUE_SIZE = 6  # 最多积压几篇等待解析的作品，解析跟不上时抓取会停下来等
+HEADLESS_WHEN_LOGGED_IN = True  # 已登录时不弹浏览器窗口；需要登录时才打开有界面的浏览器
+PAGE_RECYCLE_EVERY = 40  # 每打开多少个网页就换一个新标签页，释放渲染进程内存
+PAGE_RSS_LIMIT_MB = 1200  # 渲染进程内存超过这个值也换标签页 (需要安装 psutil)
+DISK_CACHE_MB = 64  # chrome_user_data 里浏览器磁盘缓存的上限
+WORK_INTERVAL = 1  # 深度抓取：每篇作品之间歇几秒
+STATS_PAGE_INTERVAL = 1  # Stats 翻页间隔 (秒)
+COMMENT_PAGE_INTERVAL = 1  # 评论翻页间隔 (秒)
+COMMENT_PAGE_PATH = "/comments/show_comments?page={page}&work_id={work_id}"  # 单独一页评论 (不带正文)
+RETRY_LATER_WAIT = 60  # 被 429 (Retry later) 时默认等几秒，服务器给了 Retry-After 就按它的来
+RETRY_LATER_TRIES = 3  # 同一个网页最多因为 429 重试几次
+WORK_RETRY_ROUNDS = 2  # 深度抓取失败的作品，主流程结束后再重试几轮
+WORK_RETRY_BACKOFF = 30  # 第一轮重试前等几秒，之后每轮翻倍
+WATCH_INTERVAL_HOURS = 6  # watch 模式每隔几小时看一次 Stats 和作品列表
+SERIES_PAGE_PATH = "/users/{user}/series"  # 系列列表：每个系列的作品数/字数/书签
+COLLECTION_ITEMS_PATH = "/users/{user}/collection_items?status=approved"  # 作品被收录进了哪些合集
 # =========================================
 
 def parse_int(s):
@@ -98,271 +127,1201 @@ def get_recursive_comments(soup, current_chapter_default=1):
     placeholder = soup.find("div", id="comments_placeholder")
     if placeholder:
         root_thread = placeholder.find("ol", class_="thread", recursive=False)
-        if root_thread:
-            parse_thread(root_thread)
+    else:
+        # 单独的评论页 (show_comments) 可能没有外层的 placeholder
+        root_thread = soup.find("ol", class_="thread")
+    if root_thread:
+        parse_thread(root_thread)
     
     return comments_flat_list
 
-def main():
-    print("🚀 AO3 年度总结抓取工具 [v2.3 Unrevealed Fix]")
-    print("✨ 修复: Unrevealed作品也能正确抓取完整章节列表")
-    
-    with sync_playwright() as p:
-        context = p.chromium.launch_persistent_context(
-            user_data_dir=USER_DATA_DIR,
-            headless=False, 
-            viewport={'width': 1280, 'height': 800}
-        )
-        page = context.pages[0]
+def make_soup(html):
+    """延迟导入 BeautifulSoup：只做分析/测速时不必加载"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, "html.parser")
 
-        # ================= 1. 登录验证 =================
-        print("🔗 正在验证身份...")
-        page.goto("https://archiveofourown.org/")
-        
-        user_greeting = page.locator("#greeting ul.user.navigation a[href^='/users/']").first
-        if user_greeting.count() == 0:
-            print("\n🚨 请先手动登录 (勾选Remember Me)，完成后按回车...")
-            input()
-            page.reload()
-            user_greeting = page.locator("#greeting ul.user.navigation a[href^='/users/']").first
-            if user_greeting.count() == 0:
-                print("❌ 登录失败，退出。")
-                context.close()
-                return
+# ================= 解析函数 (可在子进程里跑) =================
+# 下面这些函数只吃 HTML 字符串、只吐普通的 dict/list，
+# 这样才能丢进进程池，和浏览器抓取同时进行。
 
-        href_val = user_greeting.get_attribute("href") 
-        current_user = href_val.split("/")[-1]
-        print(f"✅ 当前用户: 【{current_user}】")
+def parse_work_blurb(item):
+    """解析作品列表里的一条 blurb，返回作品骨架 (没有 h4 时返回 None)"""
+    h4 = item.find("h4", class_="heading")
+    if not h4: return None
+    link = h4.find('a')
+    wid = link['href'].split("/")[-1]
+    title = link.text.strip()
 
-        full_data = {
-            "account": {
-                "username": current_user,
-                "fetch_time": datetime.now().isoformat(),
-            },
-            "works": []
-        }
+    categories = get_categories(item)
+    rating = get_rating(item)
+    relationships = [r.text for r in item.select("li.relationships a")]
+    # 抓取自由标签 (Freeform Tags / Additional Tags)
+    freeform_tags = [t.text for t in item.select("li.freeforms a")]
+
+    stats_dl = item.find("dl", class_="stats")
+    chapters_text = "1/1"
+    status = "Completed"
+    if stats_dl:
+        chap_dd = stats_dl.find("dd", class_="chapters")
+        if chap_dd:
+            chapters_text = chap_dd.text.strip()
+            if "/" in chapters_text:
+                curr, total = chapters_text.split('/', 1)
+                if total == "?" or curr != total:
+                    status = "In Progress"
+                else:
+                    status = "Completed"
+
+    status_span = h4.find("span", class_="status")
+    w_type = "Normal"
+    if status_span:
+        st_text = status_span.text.lower()
+        if "anonymous" in st_text: w_type = "Anonymous"
+        if "unrevealed" in st_text: w_type = "Unrevealed"
+
+    def gv(c): return parse_int(stats_dl.find("dd", class_=c).text) if stats_dl and stats_dl.find("dd", class_=c) else 0
+
+    # 系列：列表里每篇都写着 "Part 2 of <系列名>"，不用再开作品页
+    series = []
+    for li in item.select("ul.series li"):
+        s_link = li.find("a", href=SERIES_HREF_RE)
+        if not s_link: continue
+        part = li.find("strong")
+        series.append({
+            "series_id": SERIES_HREF_RE.match(s_link["href"]).group(1),
+            "title": s_link.text.strip(),
+            "part": parse_int(part.text) if part else 0,
+        })
+
+    return {
+        "work_id": wid,
+        "title": title,
+        "url": link['href'],
+        "work_type": w_type,
+        "rating": rating,
+        "categories": categories,
+        "relationships": relationships,  # ✅ 补全关系
+        "freeform_tags": freeform_tags,  # ✅ 补全自由标签
+        "status": status,
+        "chapters_text": chapters_text,
+        "fandoms": [t.text for t in item.select("h5.fandoms a")],
+        "words": gv("words"),
+        "kudos": gv("kudos"),
+        "hits": gv("hits"),
+        "comments_count": gv("comments"),
+        "date_updated": item.find("p", class_="datetime").text.strip(),
+        "real_subs": 0,       # 由主进程用 stats_map 补上
+        "real_bookmarks": 0,
+        "series": series,
+        "series_name": series[0]["title"] if series else None,
+        "series_part": series[0]["part"] if series else None,
+        "chapters_detail": []
+    }
+
+def parse_list_page(html, min_year=TARGET_YEAR):
+    """解析一页作品列表
+
+    返回 (works, stop_year)：
+    works 是这一页上 min_year 及以后的作品；
+    stop_year 不为 None 表示碰到了更早的作品，列表不用再往后翻了。
+    """
+    soup = make_soup(html)
+    works = []
+    for item in soup.select("li.own.work.blurb"):
+        # 1. 获取更新日期并进行年份检查
+        dt = item.find("p", class_="datetime")
+        if not dt:
+            continue
+        date_text = dt.text.strip()
+        # 格式通常为 "18 Dec 2025"
 
-        # ================= 2. Stats (隐形数据) =================
-        print("\n📊 [1/3] 获取 Stats (订阅/收藏)...")
-        stats_map = {}
         try:
-            page.goto(f"https://archiveofourown.org/users/{current_user}/stats")
-            soup = BeautifulSoup(page.content(), "html.parser")
-            for lnk in soup.select("a[href*='/works/']"):
-                row = lnk.find_parent("li")
-                if not row: continue
-                wid = lnk['href'].split("/")[-1]
-                txt = row.get_text()
-                if wid not in stats_map:
-                    subs = parse_int(re.search(r"Subscriptions:\s*(\d+)", txt).group(1)) if "Subscriptions:" in txt else 0
-                    bms = parse_int(re.search(r"Bookmarks:\s*(\d+)", txt).group(1)) if "Bookmarks:" in txt else 0
-                    stats_map[wid] = {"subs": subs, "bookmarks": bms}
+            # 提取末尾的 4 位数字年份
+            year_match = re.search(r"(\d{4})$", date_text)
+            if year_match:
+                year = int(year_match.group(1))
+                if year < min_year:
+                    return works, year
+        except Exception:
+            pass # 如果解析失败，稳妥起见继续往下走
+
+        w = parse_work_blurb(item)
+        if w: works.append(w)
+    return works, None
+
+def parse_navigate_html(html):
+    """解析 /navigate 章节目录，返回 chapters_detail 列表"""
+    soup_nav = make_soup(html)
+    chapters = []
+    for idx, li in enumerate(soup_nav.select("ol.chapter.index li"), 1):
+        date_span = li.find("span", class_="datetime")
+        c_date = date_span.text.strip("()") if date_span else ""
+        c_link = li.find("a")
+        c_title = c_link.text.strip() if c_link else f"Chapter {idx}"
+        chapters.append({
+            "chapter_index": idx,
+            "chapter_title": c_title,
+            "publish_date": c_date
+        })
+    return chapters
+
+def parse_work_page(html):
+    """解析全文页：发布时间 / Kudos 名单 / 评论树"""
+    soup = make_soup(html)
+    meta_published = soup.select_one("dl.work.meta.group dd.published")
+    kudos_els = soup.select("#kudos a[href^='/users/']")
+    return {
+        "published": meta_published.get_text().strip() if meta_published else None,
+        "kudos_givers": [k['href'].split("/")[-1] for k in kudos_els],
+        "comments_tree": get_recursive_comments(soup),
+    }
+
+WORK_HREF_RE = re.compile(r"^/works/(\d+)$")
+SERIES_HREF_RE = re.compile(r"^/series/(\d+)$")
+COLLECTION_HREF_RE = re.compile(r"^/collections/([^/?#]+)/?$")
+LIST_DATETIME_RE = re.compile(r'<p class="datetime">[^<]*?(\d{4})\s*</p>')
+STATS_LABEL_RE = re.compile(r"(Subscriptions|Bookmarks|Hits|Kudos|Comment Threads):\s*([\d,]+)")
+STATS_KEYS = {
+    "Subscriptions": "subs",
+    "Bookmarks": "bookmarks",
+    "Hits": "hits",
+    "Kudos": "kudos",
+    "Comment Threads": "comment_threads",
+}
+
+def parse_stats_page(html):
+    """解析一页 Stats：返回 ({work_id: {subs, bookmarks, hits, kudos, comment_threads}}, 下一页链接或 None)
+
+    每个作品链接只看它所在的那一行，一行的文字只用一个预编译正则扫一遍。
+    """
+    soup = make_soup(html)
+    stats = {}
+    for lnk in soup.find_all("a", href=WORK_HREF_RE):
+        wid = WORK_HREF_RE.match(lnk["href"]).group(1)
+        if wid in stats: continue
+        row = lnk.find_parent("li")
+        if not row: continue
+        rec = {key: 0 for key in STATS_KEYS.values()}
+        for label, num in STATS_LABEL_RE.findall(row.get_text(" ")):
+            rec[STATS_KEYS[label]] = parse_int(num)
+        stats[wid] = rec
+
+    return stats, next_page_href(soup)
+
+def next_page_href(soup):
+    next_link = soup.select_one("ol.pagination a[rel='next']")
+    return next_link["href"] if next_link and next_link.get("href") else None
+
+def parse_series_page(html):
+    """解析一页系列列表：返回 ([{series_id, title, works, words, bookmarks, date_updated}], 下一页链接或 None)"""
+    soup = make_soup(html)
+    series = []
+    for item in soup.select("li.series.blurb"):
+        link = item.find("a", href=SERIES_HREF_RE)
+        if not link: continue
+        stats_dl = item.find("dl", class_="stats")
+        def gv(c): return parse_int(stats_dl.find("dd", class_=c).text) if stats_dl and stats_dl.find("dd", class_=c) else 0
+        dt = item.find("p", class_="datetime")
+        series.append({
+            "series_id": SERIES_HREF_RE.match(link["href"]).group(1),
+            "title": link.text.strip(),
+            "works": gv("works"),
+            "words": gv("words"),
+            "bookmarks": gv("bookmarks"),
+            "date_updated": dt.text.strip() if dt else "",
+        })
+    return series, next_page_href(soup)
+
+def parse_collection_items_page(html):
+    """解析一页 collection_items：返回 ({work_id: [合集名]}, 下一页链接或 None)
+
+    这个页面的结构 AO3 改过几次，所以不认具体的 class：每个合集链接往上找，
+    在同一个列表项 (不越过 ul/ol/table) 里找到的作品链接就是被收录的那篇。
+    """
+    soup = make_soup(html)
+    found = {}
+    for c_link in soup.find_all("a", href=COLLECTION_HREF_RE):
+        node, w_link = c_link.parent, None
+        while node is not None and node.name not in ("ul", "ol", "table", "tbody", "body", "html"):
+            w_link = node.find("a", href=WORK_HREF_RE)
+            if w_link: break
+            node = node.parent
+        if not w_link: continue
+        name = c_link.text.strip() or COLLECTION_HREF_RE.match(c_link["href"]).group(1)
+        names = found.setdefault(WORK_HREF_RE.match(w_link["href"]).group(1), [])
+        if name not in names:
+            names.append(name)
+    return found, next_page_href(soup)
+
+COMMENT_ID_RE = re.compile(r'id="comment_(\d+)"')
+COMMENT_PAGE_HREF_RE = re.compile(r'href="([^"]*show_comments[^"]*)"')
+PAGE_PARAM_RE = re.compile(r"[?&;]page=(\d+)")
+
+def count_comment_pages(html):
+    """评论一共几页：只用正则扫评论区里的翻页链接，主进程里用不必建 soup"""
+    start = html.find('id="comments_placeholder"')
+    if start < 0:
+        return 1
+    pages = [int(m.group(1)) for href in COMMENT_PAGE_HREF_RE.findall(html, start)
+             for m in [PAGE_PARAM_RE.search(href)] if m]
+    return max(pages, default=1)
+
+def count_new_comments(html, max_id):
+    """这一页里 id 比 max_id 大的评论有几条 (AO3 的评论 id 随时间递增)"""
+    return sum(1 for cid in COMMENT_ID_RE.findall(html) if int(cid) > max_id)
+
+def parse_comment_page(html):
+    """解析单独的一页评论"""
+    return get_recursive_comments(make_soup(html))
+
+def parse_deep_pages(nav_status, nav_html, full_html, comment_htmls=None):
+    """一篇作品的深度解析：nav_status 是 /navigate 的结果 ("ok" / 单章作品被重定向 "redirect" / 没抓到 "failed")，
+    full_html 为 None 表示全文页没抓到
+
+    comment_htmls 是评论第 2 页起抓到的 {页码: HTML}；为 None 表示评论翻页没抓完。
+    """
+    res = {
+        "nav_status": nav_status,
+        "chapters_detail": parse_navigate_html(nav_html) if nav_status == "ok" else None,
+        "work_page": parse_work_page(full_html) if full_html is not None else None,
+        "comment_pages": None,
+    }
+    if res["work_page"] is not None and comment_htmls is not None:
+        res["comment_pages"] = {1: res["work_page"]["comments_tree"]}
+        for n, html in comment_htmls.items():
+            res["comment_pages"][n] = parse_comment_page(html)
+    return res
+
+def comment_threads(comments):
+    """扁平的评论列表按顶层评论分组：{顶层评论 id: [这一串评论 (先序)]}"""
+    threads = {}
+    root_of = {}
+    for c in comments:
+        root = root_of.get(c["parent_id"], c["id"]) if c["parent_id"] else c["id"]
+        root_of[c["id"]] = root
+        threads.setdefault(root, []).append(c)
+    return threads
+
+def merge_comment_threads(old_comments, pages):
+    """把新抓的几页评论并进旧评论树
+
+    新抓到的整串评论 (顶层评论 + 所有回复) 替换旧的同一串，没抓的页沿用旧数据，
+    parent_id / chapter_index 都以网页上的为准；最后按顶层评论 id 排 (AO3 按时间先后排评论串)。
+    """
+    threads = comment_threads(old_comments)
+    for page_comments in pages:
+        threads.update(comment_threads(page_comments))
+    return [c for root in sorted(threads, key=int) for c in threads[root]]
+
+def update_comments_state(w):
+    """记下评论的高水位：抓取时的评论数、见过的最大评论 id (下次从最后一页往前数新评论用)"""
+    w["comments_state"] = {
+        "comments_count": w.get("comments_count", 0),
+        "max_id": max((int(c["id"]) for c in w["comments_tree"]), default=0),
+    }
+
+# 深度抓取得到的字段；refresh 时没有变化的作品直接沿用旧值
+DEEP_FIELDS = ("chapters_detail", "first_published", "kudos_givers", "comments_tree", "commenters", "comments_state")
+
+def reset_deep_fields(w):
+    """重抓前把深度字段恢复成骨架的样子，免得章节被追加两遍"""
+    w["chapters_detail"] = []
+    for key in DEEP_FIELDS[1:]:
+        w.pop(key, None)
+
+def apply_deep_result(w, res):
+    """把解析结果按原来的字段顺序写回作品 dict"""
+    if res["chapters_detail"] is not None:
+        w["chapters_detail"].extend(res["chapters_detail"])
+    elif res["nav_status"] == "redirect":
+        # 如果重定向了，说明是单章 (或者极少见的特殊隐藏情况)，用更新日期兜底
+        w["chapters_detail"].append({
+            "chapter_index": 1,
+            "chapter_title": w['title'], # 单章作品没有章节名，用作品名
+            "publish_date": w['date_updated']
+        })
+
+    wp = res["work_page"]
+    if wp is None:
+        return
+
+    # 补全首次发布时间
+    if w["chapters_detail"]:
+        w["first_published"] = w["chapters_detail"][0]["publish_date"]
+    else:
+        w["first_published"] = wp["published"] or w.get("date_updated", "")
+
+    w["kudos_givers"] = wp["kudos_givers"]
+    # 带着上次的 comments_state 时是增量抓取：新抓的几页并进旧评论树
+    old_comments = (w.get("comments_tree") or []) if w.get("comments_state") else []
+    pages = res["comment_pages"] or {1: wp["comments_tree"]}
+    w["comments_tree"] = merge_comment_threads(old_comments, pages.values())
+    w["commenters"] = [
+        {"user": c["user"], "chapter_index": c["chapter_index"]}
+        for c in w["comments_tree"]
+    ]
+    if res["comment_pages"] is not None:
+        update_comments_state(w)
+    else:
+        # 评论翻页没抓完，下次只能整串重抓
+        w.pop("comments_state", None)
+
+class ParsePipeline:
+    """抓取 → 解析 的流水线
+
+    主进程只负责开网页、拿 HTML，解析交给进程池，网络和 CPU 可以同时干活。
+    等待解析的任务有上限 (max_pending)，满了就先收一个结果再继续抓。
+    """
+
+    def __init__(self, workers=None, max_pending=None, metrics=None, pool=None):
+        workers = PARSE_WORKERS if workers is None else workers
+        self.metrics = metrics
+        # 多账号时几条流水线共用一个进程池 (pool)，由创建它的人负责关掉
+        self.owns_pool = pool is None
+        if pool is None and workers > 0:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        self.pool = pool
+        self.max_pending = max(1, PARSE_QUEUE_SIZE if max_pending is None else max_pending)
+        self.pending = deque()  # (key, future, fn, args)
+        self.results = {}
+
+    def submit(self, fn, *args):
+        """提交一个解析任务，返回 Future (不计入 pending)；解析耗时记进 metrics"""
+        outer = Future()
+
+        def done(inner):
+            try:
+                result, seconds = inner.result()
+            except BaseException as e:
+                outer.set_exception(e)
+                return
+            if self.metrics is not None:
+                self.metrics.record_parse(fn.__name__, seconds)
+            outer.set_result(result)
+
+        if self.pool is not None:
+            try:
+                self.pool.submit(timed_call, fn, *args).add_done_callback(done)
+                return outer
+            except BrokenProcessPool:
+                print("   ⚠️ 解析进程池挂了，改为在主进程解析")
+                self.pool = None
+        inner = Future()
+        try:
+            inner.set_result(timed_call(fn, *args))
         except Exception as e:
-            print(f"   ⚠️ Stats 获取失败: {e}")
+            inner.set_exception(e)
+        done(inner)
+        return outer
 
-        # ================= 3. 扫描列表 (Meta信息) =================
-        print("\n📋 [2/3] 扫描作品列表...")
-        work_list_skeleton = []
+    def put(self, key, fn, *args):
+        """按 key 排队解析；队列满时阻塞到最早的任务完成"""
+        while len(self.pending) >= self.max_pending:
+            self._collect_oldest()
+        self.pending.append((key, self.submit(fn, *args), fn, args))
 
-        def scan_list(url_suffix, label, max_pages=10):
-            base_url = f"https://archiveofourown.org/users/{current_user}/{url_suffix}"
-            print(f"   > 扫描 {label} ...")
-            page_num = 1
+    def _collect_oldest(self):
+        key, fut, fn, args = self.pending.popleft()
+        try:
+            self.results[key] = fut.result()
+        except BrokenProcessPool:
+            self.pool = None
             try:
-                while page_num <= max_pages:
-                    url = base_url if page_num == 1 else f"{base_url}?page={page_num}"
-                    print(f"     - Page {page_num}")
-                    page.goto(url, timeout=60000)
-                    # page.goto(base_url)
-                    if page.locator("text='Proceed'").count() > 0: page.click("text='Proceed'")
-                    
-                    soup = BeautifulSoup(page.content(), "html.parser")
-                    items = soup.select("li.own.work.blurb") 
-                    if not items:
-                        return
-                
-                    for item in items:
-                        # 1. 获取更新日期并进行年份检查
-                        dt = item.find("p", class_="datetime")
-                        if not dt:
-                            continue
-                        date_text = dt.text.strip()
-                        # 格式通常为 "18 Dec 2025"
-                        
-                        try:
-                            # 提取末尾的 4 位数字年份
-                            year_match = re.search(r"(\d{4})$", date_text)
-                            if year_match:
-                                year = int(year_match.group(1))
-                                if year < 2025:
-                                    print(f"  🛑 发现 {year} 年作品，停止扫描该列表。")
-                                    return # 直接跳出当前的 scan_list 函数
-                        except Exception:
-                            pass # 如果解析失败，稳妥起见继续往下走
-
-                        h4 = item.find("h4", class_="heading")
-                        if not h4: continue
-                        link = h4.find('a')
-                        wid = link['href'].split("/")[-1]
-                        title = link.text.strip()
-                        
-                        categories = get_categories(item)
-                        rating = get_rating(item)
-                        relationships = [r.text for r in item.select("li.relationships a")]
-                        # 抓取自由标签 (Freeform Tags / Additional Tags)
-                        freeform_tags = [t.text for t in item.select("li.freeforms a")]
-
-                        stats_dl = item.find("dl", class_="stats")
-                        chapters_text = "1/1"
-                        status = "Completed"
-                        if stats_dl:
-                            chap_dd = stats_dl.find("dd", class_="chapters")
-                            if chap_dd:
-                                chapters_text = chap_dd.text.strip()
-                                if "/" in chapters_text:
-                                    curr, total = chapters_text.split('/', 1)
-                                    if total == "?" or curr != total:
-                                        status = "In Progress"
-                                    else:
-                                        status = "Completed"
-                        
-                        status_span = h4.find("span", class_="status")
-                        w_type = "Normal"
-                        if status_span:
-                            st_text = status_span.text.lower()
-                            if "anonymous" in st_text: w_type = "Anonymous"
-                            if "unrevealed" in st_text: w_type = "Unrevealed"
-
-                        def gv(c): return parse_int(stats_dl.find("dd", class_=c).text) if stats_dl and stats_dl.find("dd", class_=c) else 0
-                        
-                        if not any(x['work_id'] == wid for x in work_list_skeleton):
-                            work_list_skeleton.append({
-                                "work_id": wid,
-                                "title": title,
-                                "url": link['href'],
-                                "work_type": w_type,
-                                "rating": rating,
-                                "categories": categories,
-                                "relationships": relationships,  # ✅ 补全关系
-                                "freeform_tags": freeform_tags,  # ✅ 补全自由标签
-                                "status": status,
-                                "chapters_text": chapters_text,
-                                "fandoms": [t.text for t in item.select("h5.fandoms a")],
-                                "words": gv("words"),
-                                "kudos": gv("kudos"),
-                                "hits": gv("hits"),
-                                "comments_count": gv("comments"),
-                                "date_updated": item.find("p", class_="datetime").text.strip(),
-                                "real_subs": stats_map.get(wid, {}).get("subs", 0),
-                                "real_bookmarks": stats_map.get(wid, {}).get("bookmarks", 0),
-                                "chapters_detail": [] 
-                            })
-                    page_num += 1
-                    time.sleep(2)  # 👈 非常重要
+                self.results[key] = fn(*args)
             except Exception as e:
-                print(f"   ⚠️ 扫描 {label} 出错: {e}")
+                self.results[key] = e
+        except Exception as e:
+            self.results[key] = e
 
-        scan_list("works", "主页作品")
-        scan_list("works/collected", "合集作品")
-        print(f"   ✔ 共发现 {len(work_list_skeleton)} 篇作品")
+    def drain(self):
+        """等所有排队的解析完成，返回 {key: 结果或异常}；结果交出去以后流水线里不再留着"""
+        while self.pending:
+            self._collect_oldest()
+        results, self.results = self.results, {}
+        return results
 
-        # ================= 4. 深度抓取 =================
-        print("\n🕵️ [3/3] 深度抓取 (章节详情 & 评论树)...")
-        
-        final_works = []
-        for w in tqdm(work_list_skeleton, desc="Processing"):
+    def close(self):
+        if self.pool is not None and self.owns_pool:
+            self.pool.shutdown()
+
+def launch_context(p, headless, user_data_dir=None):
+    """打开带登录状态的浏览器 (限制磁盘缓存，避免 chrome_user_data 无限变大)"""
+    cache_bytes = DISK_CACHE_MB * 1024 * 1024
+    return p.chromium.launch_persistent_context(
+        user_data_dir=user_data_dir or USER_DATA_DIR,
+        headless=headless,
+        viewport={'width': 1280, 'height': 800},
+        args=[f"--disk-cache-size={cache_bytes}", f"--media-cache-size={cache_bytes}"]
+    )
+
+def renderer_rss_mb():
+    """当前所有 Chromium 渲染进程的内存 (MB)，没有 psutil 时返回 None"""
+    if psutil is None:
+        return None
+    total = 0
+    try:
+        for proc in psutil.Process().children(recursive=True):
             try:
-                # --- Step A: 抓取章节详情 (/navigate) ---
-                # 【修改点】: 移除了对 "Unrevealed" 的过滤，让所有作品都尝试抓取 navigate
-                # 因为作者本人有权限看到 Unrevealed 作品的章节列表
-                
-                nav_url = f"https://archiveofourown.org{w['url']}/navigate"
-                page.goto(
-                nav_url,
-                timeout=60000,
-                wait_until="domcontentloaded"
-            )
-
-                if page.locator("text='Proceed'").count() > 0: page.click("text='Proceed'")
-                
-                # 检查 URL 是否还在 navigate 页面 (单章作品会自动重定向回主页)
-                if "/navigate" in page.url:
-                    soup_nav = BeautifulSoup(page.content(), "html.parser")
-                    chap_items = soup_nav.select("ol.chapter.index li")
-                    
-                    for idx, li in enumerate(chap_items, 1):
-                        date_span = li.find("span", class_="datetime")
-                        c_date = date_span.text.strip("()") if date_span else ""
-                        c_link = li.find("a")
-                        c_title = c_link.text.strip() if c_link else f"Chapter {idx}"
-                        
-                        w["chapters_detail"].append({
-                            "chapter_index": idx,
-                            "chapter_title": c_title,
-                            "publish_date": c_date
-                        })
-                else:
-                    # 如果重定向了，说明是单章 (或者极少见的特殊隐藏情况)，用更新日期兜底
-                    w["chapters_detail"].append({
-                        "chapter_index": 1,
-                        "chapter_title": w['title'], # 单章作品没有章节名，用作品名
-                        "publish_date": w['date_updated']
-                    })
-                
-                # 如果 Unrevealed 抓取成功，chapters_detail 应该有 25 项了
-                
-                # --- Step B: 抓取全文与评论 ---
-                full_url = f"https://archiveofourown.org{w['url']}?view_full_work=true&show_comments=true&view_adult=true"
-                page.goto(full_url, timeout=60000)
-                if page.locator("text='Proceed'").count() > 0: 
-                    page.click("text='Proceed'")
-                    page.wait_for_load_state("domcontentloaded")
-
-                soup = BeautifulSoup(page.content(), "html.parser")
-
-                # 补全首次发布时间
-                if w["chapters_detail"]:
-                    w["first_published"] = w["chapters_detail"][0]["publish_date"]
-                else:
-                    meta_published = soup.select_one("dl.work.meta.group dd.published")
-                    w["first_published"] = meta_published.get_text().strip() if meta_published else w.get("date_updated", "")
-
-                # 抓取 Kudos
-                try:
-                    if page.locator("#kudos_summary a:has-text('others')").count() > 0:
-                        page.click("#kudos_summary a:has-text('others')")
-                        page.wait_for_timeout(500)
-                        soup = BeautifulSoup(page.content(), "html.parser")
-                except: pass
-
-                kudos_els = soup.select("#kudos a[href^='/users/']")
-                w["kudos_givers"] = [k['href'].split("/")[-1] for k in kudos_els]
-
-                # 抓取评论树
-                comments_tree = get_recursive_comments(soup)
-                w["comments_tree"] = comments_tree
-                
-                w["commenters"] = [
-                    {"user": c["user"], "chapter_index": c["chapter_index"]}
-                    for c in comments_tree
-                ]
+                if "--type=renderer" in " ".join(proc.cmdline()):
+                    total += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    except psutil.Error:
+        return None
+    return total / (1024 * 1024)
+
+class BrowserTab:
+    """给 page 包一层：数导航次数，定期换新标签页
+
+    同一个 page 连开几百个大页面，渲染进程内存只涨不跌；
+    每 PAGE_RECYCLE_EVERY 次导航或内存超过 PAGE_RSS_LIMIT_MB 时，
+    开一个新标签页再关掉旧的。其它属性都直接转给当前的 page。
+    """
+
+    def __init__(self, context, page=None, recycle_every=None, rss_limit_mb=None, metrics=None):
+        self.context = context
+        self.metrics = metrics
+        self.page = page or (context.pages[0] if context.pages else context.new_page())
+        self.recycle_every = PAGE_RECYCLE_EVERY if recycle_every is None else recycle_every
+        self.rss_limit_mb = PAGE_RSS_LIMIT_MB if rss_limit_mb is None else rss_limit_mb
+        self.navigations = 0
+        self.since_recycle = 0
+        self.recycles = 0
+        self.rss_samples = []  # 每次检查时的渲染进程内存 (MB)
+        self.pending_from = None  # start() 发出导航时所在的 URL
+        self.pending_url = None
+        self.pending_t0 = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self.page, name)
+
+    def goto(self, url, **kwargs):
+        """打开网页；碰到 429 (Retry later) 就按 Retry-After 等一等再试"""
+        for attempt in range(RETRY_LATER_TRIES + 1):
+            self._before_navigation()
+            t0 = time.perf_counter()
+            resp = self.page.goto(url, **kwargs)
+            self._record(url, t0)
+            if resp is None or resp.status != 429 or attempt == RETRY_LATER_TRIES:
+                return resp
+            retry_after = resp.headers.get("retry-after", "").strip()
+            wait = int(retry_after) if retry_after.isdigit() else RETRY_LATER_WAIT
+            print(f"   ⏳ AO3 说 Retry later，{wait} 秒后重试...")
+            if self.metrics is not None:
+                self.metrics.incr("retries")
+                self.metrics.incr("throttle_wait_seconds", wait)
+            time.sleep(wait)
+        return resp
+
+    def reload(self, **kwargs):
+        self._before_navigation()
+        return self.page.reload(**kwargs)
+
+    def start(self, url):
+        """开始加载 url 但不等它加载完，之后用 finish() 取 HTML"""
+        self._before_navigation()
+        if url == self.page.url:
+            t0 = time.perf_counter()
+            self.page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            self._record(url, t0)
+            self.pending_from = None
+            return
+        self.pending_from = self.page.url
+        self.pending_url = url
+        self.pending_t0 = time.perf_counter()
+        # 用 setTimeout 让 evaluate 先返回，避免“执行上下文被导航销毁”的报错
+        self.page.evaluate("u => { setTimeout(() => { window.location.href = u; }, 0); }", url)
+
+    def finish(self, timeout=60000):
+        """等 start() 的页面加载完并返回 HTML；只有 HTML 里出现 Proceed 时才去找按钮"""
+        if self.pending_from is not None:
+            old, self.pending_from = self.pending_from, None
+            self.page.wait_for_url(lambda u: u != old, wait_until="domcontentloaded", timeout=timeout)
+            self._record(self.pending_url, self.pending_t0)
+        html = self.page.content()
+        if "Retry later" in html and len(html) < 5000:
+            # 非阻塞导航拿不到状态码，看着像 429 页面就走一遍带重试的 goto
+            self.goto(self.page.url, timeout=timeout, wait_until="domcontentloaded")
+            html = self.page.content()
+        if "Proceed" in html and self.page.locator("text='Proceed'").count() > 0:
+            self.page.click("text='Proceed'")
+            self.page.wait_for_load_state("domcontentloaded")
+            html = self.page.content()
+        return html
+
+    def cancel(self):
+        """放弃 start() 发出的导航 (结果不要了)，让标签页停下来，别把这一页继续下完"""
+        if self.pending_from is not None:
+            self.pending_from = None
+            try:
+                self.page.goto("about:blank")
+            except Exception:
+                pass
+
+    def _record(self, url, t0):
+        """记一次导航的耗时和传输字节数 (来自浏览器的 Navigation Timing)"""
+        if self.metrics is None:
+            return
+        try:
+            nbytes = self.page.evaluate(
+                "() => { const n = performance.getEntriesByType('navigation')[0]; return n ? n.transferSize : 0; }")
+        except Exception:
+            nbytes = 0
+        self.metrics.record_request(url, time.perf_counter() - t0, nbytes or 0)
+
+    def _before_navigation(self):
+        if self.since_recycle and self.since_recycle % 5 == 0:
+            rss = renderer_rss_mb()
+            if rss is not None:
+                self.rss_samples.append(rss)
+                if rss > self.rss_limit_mb:
+                    print(f"   ♻️ 渲染进程内存 {rss:.0f} MB，换个新标签页")
+                    self.recycle()
+        if self.recycle_every and self.since_recycle >= self.recycle_every:
+            self.recycle()
+        self.navigations += 1
+        self.since_recycle += 1
+
+    def spawn(self):
+        """在同一个 context 里再开一个标签页，设置和自己一样"""
+        return BrowserTab(self.context, page=self.context.new_page(), recycle_every=self.recycle_every,
+                          rss_limit_mb=self.rss_limit_mb, metrics=self.metrics)
+
+    def recycle(self):
+        old = self.page
+        self.page = self.context.new_page()
+        old.close()
+        self.recycles += 1
+        self.since_recycle = 0
+
+    def memory_report(self):
+        rss = renderer_rss_mb()
+        if rss is not None:
+            self.rss_samples.append(rss)
+        if not self.rss_samples:
+            return f"共打开 {self.navigations} 个网页，换标签页 {self.recycles} 次 (安装 psutil 可查看内存)"
+        return (f"共打开 {self.navigations} 个网页，换标签页 {self.recycles} 次；"
+                f"渲染进程内存 起始 {self.rss_samples[0]:.0f} MB / "
+                f"峰值 {max(self.rss_samples):.0f} MB / 结束 {self.rss_samples[-1]:.0f} MB")
+
+def fetch_stats(tab, username, years=None, max_pages=20, strict=False):
+    """抓 Stats 页 (平铺视图，按日期排序)，有翻页就跟着翻
+    作品列表收的是 TARGET_YEAR 及以后更新的作品，所以默认从 TARGET_YEAR 到今年每年各看一遍再合起来。
+    出错时默认返回已经抓到的部分；strict=True 时返回 None，让调用方知道这次的数不能用"""
+    stats_map = {}
+    if years is None:
+        years = range(TARGET_YEAR, max(TARGET_YEAR, datetime.now().year) + 1)
+    try:
+        for year in years:
+            url = (f"{BASE_URL}/users/{username}/stats"
+                   f"?year={year}&flat_view=true&sort_column=date&sort_direction=DESC")
+            for _ in range(max_pages):
+                tab.goto(url, timeout=60000, wait_until="domcontentloaded")
+                page_stats, next_href = parse_stats_page(tab.content())
+                for wid, rec in page_stats.items():
+                    stats_map.setdefault(wid, rec)
+                if not next_href:
+                    break
+                url = next_href if next_href.startswith("http") else f"{BASE_URL}{next_href}"
+                time.sleep(STATS_PAGE_INTERVAL)
+    except Exception as e:
+        print(f"   ⚠️ Stats 获取失败: {e}")
+        if strict:
+            return None
+    print(f"   ✔ Stats 中找到 {len(stats_map)} 篇作品")
+    return stats_map
+
+class RateLimiter:
+    """两次请求开始之间至少隔 min_interval 秒 (页面加载和解析的时间也算在里面)"""
+
+    def __init__(self, min_interval, metrics=None):
+        self.min_interval = min_interval
+        self.metrics = metrics
+        self.last = 0.0
+
+    def wait(self):
+        delay = self.last + self.min_interval - time.monotonic()
+        if delay > 0:
+            if self.metrics is not None:
+                self.metrics.incr("throttle_wait_seconds", delay)
+            time.sleep(delay)
+        self.last = time.monotonic()
+
+class ListScan:
+    """一个作品列表的翻页进度"""
+
+    def __init__(self, tab, base_url, label, max_pages):
+        self.tab = tab
+        self.base_url = base_url
+        self.label = label
+        self.max_pages = max_pages
+        self.page_num = 0
+        self.loading = False
+        self.works = {}  # work_id -> 作品骨架 (按出现顺序)
+
+    def load_next(self, limiter):
+        limiter.wait()
+        self.page_num += 1
+        print(f"     - {self.label} Page {self.page_num}")
+        url = self.base_url if self.page_num == 1 else f"{self.base_url}?page={self.page_num}"
+        self.tab.start(url)
+        self.loading = True
 
-                final_works.append(w)
-                time.sleep(1) 
+def scan_work_lists(tabs, username, pipeline, max_pages=10, metrics=None):
+    """同时翻 works 和 works/collected 两个列表
 
+    每个列表一个标签页；当前页交给解析时，下一页已经在加载。
+    碰到 TARGET_YEAR 之前的作品就停。返回 {work_id: 作品骨架}，主页作品在前。
+    """
+    listings = [("works", "主页作品"), ("works/collected", "合集作品")]
+    limiter = RateLimiter(LIST_PAGE_INTERVAL, metrics)
+    scans = []
+    for tab, (suffix, label) in zip(tabs, listings):
+        print(f"   > 扫描 {label} ...")
+        scans.append(ListScan(tab, f"{BASE_URL}/users/{username}/{suffix}", label, max_pages))
+
+    active = []
+    for sc in scans:
+        try:
+            sc.load_next(limiter)
+            active.append(sc)
+        except Exception as e:
+            print(f"   ⚠️ 扫描 {sc.label} 出错: {e}")
+
+    while active:
+        for sc in list(active):
+            try:
+                html = sc.tab.finish()
+                sc.loading = False
+                parsed = pipeline.submit(parse_list_page, html, TARGET_YEAR)
+                # 先把下一页发出去，再等这一页的解析结果；
+                # 这一页最后一篇 (最早的) 已经早于 TARGET_YEAR 的话下一页肯定用不上，不发
+                years = LIST_DATETIME_RE.findall(html)
+                if (sc.page_num < sc.max_pages and 'rel="next"' in html
+                        and not (years and int(years[-1]) < TARGET_YEAR)):
+                    sc.load_next(limiter)
+
+                works, stop_year = parsed.result()
+                for w in works:
+                    sc.works.setdefault(w["work_id"], w)
+
+                if stop_year is not None:
+                    print(f"  🛑 {sc.label} 发现 {stop_year} 年作品，停止扫描该列表。")
+                elif works and sc.loading:
+                    continue
             except Exception as e:
-                print(f"❌ 错误《{w['title']}》: {e}")
-                final_works.append(w) 
+                print(f"   ⚠️ 扫描 {sc.label} 出错: {e}")
+            if sc.loading:
+                sc.tab.cancel()
+                sc.loading = False
+            active.remove(sc)
+
+    skeleton = {}
+    for sc in scans:
+        for wid, w in sc.works.items():
+            skeleton.setdefault(wid, w)
+    return skeleton
+
+def login(p, metrics, user_data_dir=None):
+    """打开浏览器并确认登录状态，返回 (context, page, 用户名)；登录失败返回 None"""
+    metrics.begin("login")
+    context = launch_context(p, headless=HEADLESS_WHEN_LOGGED_IN, user_data_dir=user_data_dir)
+    page = BrowserTab(context, metrics=metrics)
+
+    # ================= 1. 登录验证 =================
+    print("🔗 正在验证身份...")
+    page.goto(f"{BASE_URL}/")
+
+    user_greeting = page.locator("#greeting ul.user.navigation a[href^='/users/']").first
+    if user_greeting.count() == 0 and HEADLESS_WHEN_LOGGED_IN:
+        # 没登录：换成有界面的浏览器让用户手动登录
+        context.close()
+        context = launch_context(p, headless=False, user_data_dir=user_data_dir)
+        page = BrowserTab(context, metrics=metrics)
+        page.goto(f"{BASE_URL}/")
+        user_greeting = page.locator("#greeting ul.user.navigation a[href^='/users/']").first
+    if user_greeting.count() == 0:
+        print("\n🚨 请先手动登录 (勾选Remember Me)，完成后按回车...")
+        input()
+        page.reload()
+        user_greeting = page.locator("#greeting ul.user.navigation a[href^='/users/']").first
+        if user_greeting.count() == 0:
+            print("❌ 登录失败，退出。")
+            context.close()
+            return None
+
+    href_val = user_greeting.get_attribute("href")
+    current_user = href_val.split("/")[-1]
+    print(f"✅ 当前用户: 【{current_user}】")
+    return context, page, current_user
+
+def collect_skeleton(page, current_user, pipeline, metrics, require_stats=False):
+    """Stats + 作品列表 → 作品骨架列表 (已经填好订阅/收藏数)
+    require_stats=True 时 Stats 没抓全就返回 None (订阅/收藏会被当成 0)"""
+    # ================= 2. Stats (隐形数据) =================
+    metrics.begin("stats")
+    print("\n📊 [1/3] 获取 Stats (订阅/收藏)...")
+    stats_map = fetch_stats(page, current_user, strict=require_stats)
+    if stats_map is None:
+        return None
+
+    # ================= 3. 扫描列表 (Meta信息) =================
+    metrics.begin("list_scan")
+    print("\n📋 [2/3] 扫描作品列表...")
+    list_tab = page.spawn()
+    skeleton = scan_work_lists([page, list_tab], current_user, pipeline, metrics=metrics)
+    list_tab.close()
+
+    work_list_skeleton = []
+    for wid, w in skeleton.items():
+        w["real_subs"] = stats_map.get(wid, {}).get("subs", 0)
+        w["real_bookmarks"] = stats_map.get(wid, {}).get("bookmarks", 0)
+        work_list_skeleton.append(w)
+    print(f"   ✔ 共发现 {len(work_list_skeleton)} 篇作品")
+    return work_list_skeleton
+
+def fetch_listing(tab, url, parse, pipeline, max_pages=20):
+    """顺着"下一页"翻一个汇总列表，每页交给 parse (返回 (这一页的结果, 下一页链接))，返回各页结果"""
+    results = []
+    for _ in range(max_pages):
+        tab.goto(url, timeout=60000, wait_until="domcontentloaded")
+        items, next_href = pipeline.submit(parse, tab.content()).result()
+        results.append(items)
+        if not next_href:
+            break
+        url = next_href if next_href.startswith("http") else f"{BASE_URL}{next_href}"
+        time.sleep(LIST_PAGE_INTERVAL)
+    return results
+
+def fetch_series_and_collections(page, current_user, works, pipeline, metrics):
+    """系列汇总和合集收录：各翻一遍汇总页，按 work_id 对回作品 (填 collections_info)，不用每篇多开网页
+
+    返回 series_list；某一项没抓到时返回 None / 不填 collections_info，分析时就跳过那一段。
+    """
+    metrics.begin("series_collections")
+    print("\n📚 扫描系列和合集...")
+    series_list = None
+    try:
+        pages = fetch_listing(page, BASE_URL + SERIES_PAGE_PATH.format(user=current_user), parse_series_page, pipeline)
+        series_list = [s for items in pages for s in items]
+    except Exception as e:
+        print(f"   ⚠️ 系列列表获取失败: {e}")
+
+    collections = None
+    try:
+        pages = fetch_listing(page, BASE_URL + COLLECTION_ITEMS_PATH.format(user=current_user),
+                              parse_collection_items_page, pipeline)
+        collections = {}
+        for found in pages:
+            for wid, names in found.items():
+                bucket = collections.setdefault(wid, [])
+                bucket.extend(n for n in names if n not in bucket)
+    except Exception as e:
+        print(f"   ⚠️ 合集收录获取失败: {e}")
+    if collections is not None:
+        for w in works:
+            w["collections_info"] = collections.get(w["work_id"], [])
+
+    in_series = sum(1 for w in works if w.get("series"))
+    print(f"   ✔ {len(series_list or [])} 个系列 ({in_series} 篇作品属于系列)，"
+          f"{sum(1 for w in works if w.get('collections_info'))} 篇作品被收录进合集")
+    return series_list
+
+def fetch_comment_pages(page, w, full_html, metrics):
+    """抓评论第 2 页起的各页，返回 {页码: HTML}
+
+    作品带着上次的 comments_state 时只做增量：评论串按时间排，新的在后面，
+    所以从最后一页往前翻，数到的新评论 (id 比上次见过的最大 id 大) 够了评论数的增量就停。
+    """
+    page_count = count_comment_pages(full_html)
+    state = w.get("comments_state")
+    wanted = None
+    found = 0
+    if state is not None:
+        wanted = w.get("comments_count", 0) - state.get("comments_count", 0)
+        found = count_new_comments(full_html, state.get("max_id", 0))
+
+    htmls = {}
+    for n in range(page_count, 1, -1):
+        if wanted is not None and found >= wanted:
+            break
+        url = BASE_URL + COMMENT_PAGE_PATH.format(page=n, work_id=w["work_id"])
+        page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        htmls[n] = page.content()
+        if state is not None:
+            found += count_new_comments(htmls[n], state.get("max_id", 0))
+        metrics.incr("throttle_wait_seconds", COMMENT_PAGE_INTERVAL)
+        time.sleep(COMMENT_PAGE_INTERVAL)
+    metrics.incr("comment_pages", len(htmls) + 1)
+    metrics.incr("comment_pages_skipped", page_count - 1 - len(htmls))
+    return htmls
+
+def deep_pass(page, works, pipeline, metrics, phase="deep_fetch", desc="深度抓取"):
+    """逐篇抓 /navigate、全文页和评论翻页，解析结果写回作品；返回 {work_id: (失败的步骤, 错误)}"""
+    metrics.begin(phase)
+    failures = {}
+    for w in progress(works, desc=desc):
+        nav_status = "failed"  # navigate 出错时不能当成单章作品，不编章节数据
+        nav_html = None
+        full_html = None
+        comment_htmls = None
+        step = "navigate"
+        try:
+            # --- Step A: 抓取章节详情 (/navigate) ---
+            # 【修改点】: 移除了对 "Unrevealed" 的过滤，让所有作品都尝试抓取 navigate
+            # 因为作者本人有权限看到 Unrevealed 作品的章节列表
+
+            nav_url = f"{BASE_URL}{w['url']}/navigate"
+            page.goto(
+            nav_url,
+            timeout=60000,
+            wait_until="domcontentloaded"
+        )
+
+            if page.locator("text='Proceed'").count() > 0: page.click("text='Proceed'")
+
+            # 检查 URL 是否还在 navigate 页面 (单章作品会自动重定向回主页)
+            if "/navigate" in page.url:
+                nav_html = page.content()
+                nav_status = "ok"
+            else:
+                nav_status = "redirect"
+
+            # --- Step B: 抓取全文与评论 ---
+            step = "full_work"
+            full_url = f"{BASE_URL}{w['url']}?view_full_work=true&show_comments=true&view_adult=true"
+            page.goto(full_url, timeout=60000)
+            if page.locator("text='Proceed'").count() > 0:
+                page.click("text='Proceed'")
+                page.wait_for_load_state("domcontentloaded")
+
+            # 展开完整 Kudos 名单
+            try:
+                if page.locator("#kudos_summary a:has-text('others')").count() > 0:
+                    page.click("#kudos_summary a:has-text('others')")
+                    page.wait_for_timeout(500)
+            except: pass
+
+            full_html = page.content()
+
+            # --- Step C: 评论翻页 (第 1 页已经在全文页里) ---
+            step = "comments"
+            comment_htmls = fetch_comment_pages(page, w, full_html, metrics)
+
+            metrics.incr("throttle_wait_seconds", WORK_INTERVAL)
+            time.sleep(WORK_INTERVAL)
+
+        except Exception as e:
+            print(f"❌ 错误《{w['title']}》({step}): {e}")
+            failures[w["work_id"]] = (step, str(e))
+
+        # 抓到多少交多少，解析在进程池里和下一篇的抓取同时进行
+        pipeline.put(w["work_id"], parse_deep_pages, nav_status, nav_html, full_html, comment_htmls)
+
+    # 按原顺序把解析结果拼回作品 (失败的作品也先填上抓到的部分)
+    metrics.begin("parse_wait")
+    results = pipeline.drain()
+    for w in works:
+        res = results.get(w["work_id"])
+        if isinstance(res, Exception):
+            print(f"❌ 解析错误《{w['title']}》: {res}")
+            failures.setdefault(w["work_id"], ("parse", str(res)))
+        elif res is not None:
+            apply_deep_result(w, res)
+    return failures
+
+def deep_fetch(page, works, pipeline, metrics, attempts=None):
+    """深度抓取 + 失败重试：works 原地补全，返回重试后仍然失败的作品 (写进 DB 的 failed_works)
+
+    attempts 是之前已经试过的次数 ({work_id: 次数})，--retry-failed 时接着累加。
+    """
+    # ================= 4. 深度抓取 =================
+    print("\n🕵️ [3/3] 深度抓取 (章节详情 & 评论树)...")
+    attempts = dict(attempts or {})
+    by_id = {w["work_id"]: w for w in works}
 
-        # 5. 保存
-        full_data["works"] = final_works
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(full_data, f, ensure_ascii=False, indent=2)
+    failures = deep_pass(page, works, pipeline, metrics)
+    for w in works:
+        attempts[w["work_id"]] = attempts.get(w["work_id"], 0) + 1
 
-        print("\n" + "="*50)
-        print(f"🎉 抓取完成！数据已保存至 {DATA_FILE}")
-        print("="*50)
+    # 失败的作品排进重试队列，等一等再抓，每轮等待翻倍
+    for rnd in range(1, WORK_RETRY_ROUNDS + 1):
+        if not failures:
+            break
+        wait = WORK_RETRY_BACKOFF * 2 ** (rnd - 1)
+        print(f"\n🔁 {len(failures)} 篇作品抓取失败，{wait} 秒后第 {rnd} 轮重试...")
+        metrics.begin("retry_wait")
+        metrics.incr("throttle_wait_seconds", wait)
+        time.sleep(wait)
+
+        retry = [by_id[wid] for wid in failures]
+        for w in retry:
+            reset_deep_fields(w)
+            attempts[w["work_id"]] += 1
+        metrics.incr("work_retries", len(retry))
+        failures = deep_pass(page, retry, pipeline, metrics, phase="retry", desc=f"第 {rnd} 轮重试")
+
+    now = datetime.now().isoformat()
+    dead = []
+    for w in works:
+        if w["work_id"] in failures:
+            step, error = failures[w["work_id"]]
+            dead.append({
+                "work_id": w["work_id"],
+                "title": w["title"],
+                "url": w["url"],
+                "step": step,
+                "error": error,
+                "attempts": attempts[w["work_id"]],
+                "last_attempt": now,
+            })
+    if dead:
+        print(f"\n⚠️ {len(dead)} 篇作品重试后仍然失败，已记在 failed_works 里；"
+              f"之后可以用 --retry-failed 只重抓这几篇。")
+    return dead
+
+
+def save_db(full_data, page, metrics, data_file=None):
+    """5. 保存，并打印这次运行的内存/耗时汇总"""
+    data_file = data_file or DATA_FILE
+    metrics.begin("save")
+    with open(data_file, "w", encoding="utf-8") as f:
+        json.dump(full_data, f, ensure_ascii=False, indent=2)
+    try:
+        # 分析时直接 mmap 这份列式快照，不用再解析整个 .json
+        write_snapshot(full_data, snapshot_path(data_file), source=data_file)
+    except OSError as e:
+        print(f"⚠️ 快照没写成，分析时会直接读 .json: {e}")
+    metrics.end()
+
+    print("\n" + "="*50)
+    print(f"🎉 抓取完成！数据已保存至 {data_file}")
+    print(f"🧠 {page.memory_report()}")
+    metrics.print_summary()
+    print(f"📈 运行数据已保存至 {metrics.write(data_file)}")
+    print("="*50)
+
+def fetch_works(page, current_user, pipeline, metrics):
+    """已登录之后的完整抓取：Stats → 列表 → 深度抓取，返回要保存的 DB"""
+    full_data = {
+        "account": {
+            "username": current_user,
+            "fetch_time": datetime.now().isoformat(),
+        },
+        "works": [],
+        "failed_works": [],
+    }
+    work_list_skeleton = collect_skeleton(page, current_user, pipeline, metrics)
+    series_list = fetch_series_and_collections(page, current_user, work_list_skeleton, pipeline, metrics)
+    if series_list is not None:
+        full_data["series_list"] = series_list
+    full_data["failed_works"] = deep_fetch(page, work_list_skeleton, pipeline, metrics)
+    full_data["works"] = work_list_skeleton
+    return full_data
+
+def fetch_account(metrics):
+    """登录 → Stats → 列表 → 深度抓取 → 保存，各阶段耗时记进 metrics"""
+    from playwright.sync_api import sync_playwright  # 延迟导入：只做分析/测速时不用加载 Playwright
+
+    print("🚀 AO3 年度总结抓取工具 [v2.3 Unrevealed Fix]")
+    print("✨ 修复: Unrevealed作品也能正确抓取完整章节列表")
+
+    with sync_playwright() as p:
+        session = login(p, metrics)
+        if session is None:
+            return
+        context, page, current_user = session
+
+        pipeline = ParsePipeline(metrics=metrics)
+        full_data = fetch_works(page, current_user, pipeline, metrics)
+        pipeline.close()
+
+        save_db(full_data, page, metrics)
         context.close()
 
+def load_old_db():
+    """refresh / --retry-failed 用：读已有的 DB，没有就返回 None"""
+    try:
+        with open(DATA_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"❌ 找不到旧数据 {DATA_FILE}，请先完整抓取一次。")
+        return None
+
+def needs_deep_refresh(old, new):
+    """章节数、评论数、kudos 数有变化的作品才需要重新深度抓取"""
+    return any(old.get(k) != new.get(k) for k in ("chapters_text", "comments_count", "kudos"))
+
+def refresh_account(metrics):
+    """轻量刷新：重扫 Stats 和作品列表更新计数，只有新作品、有变化的作品和上次失败的作品才重新深度抓取"""
+    from playwright.sync_api import sync_playwright
+
+    old_data = load_old_db()
+    if old_data is None:
+        return
+
+    print("🔄 AO3 年度总结 · 刷新数据")
+    with sync_playwright() as p:
+        session = login(p, metrics)
+        if session is None:
+            return
+        context, page, current_user = session
+
+        old_works = {}
+        old_failed = {}
+        if old_data.get("account", {}).get("username") == current_user:
+            old_works = {w.get("work_id"): w for w in old_data.get("works", [])}
+            old_failed = {d["work_id"]: d.get("attempts", 0) for d in old_data.get("failed_works", [])}
+        else:
+            print("   ⚠️ 当前登录的账号和旧数据不同，全部重新抓取。")
+
+        pipeline = ParsePipeline(metrics=metrics)
+        works = collect_skeleton(page, current_user, pipeline, metrics)
+        series_list = fetch_series_and_collections(page, current_user, works, pipeline, metrics)
+        stale = []
+        for w in works:
+            old = old_works.get(w["work_id"])
+            if old is not None and "collections_info" not in w and "collections_info" in old:
+                w["collections_info"] = old["collections_info"]  # 这次合集页没抓到，沿用上次的
+            if old is None or w["work_id"] in old_failed or needs_deep_refresh(old, w):
+                stale.append(w)
+                state = old.get("comments_state") if old and w["work_id"] not in old_failed else None
+                if state and w.get("comments_count", 0) >= state.get("comments_count", 0):
+                    # 评论只做增量：带上旧评论树和高水位，只翻可能有新评论的页
+                    w["comments_tree"] = old.get("comments_tree", [])
+                    w["comments_state"] = state
+            else:
+                for key in DEEP_FIELDS:
+                    if key in old:
+                        w[key] = old[key]
+        print(f"   ✔ {len(works) - len(stale)} 篇没有变化，沿用旧数据；{len(stale)} 篇需要重新抓取")
+        failed = deep_fetch(page, stale, pipeline, metrics, attempts=old_failed)
+        pipeline.close()
+
+        # 重试后仍然失败的作品：深度字段换回旧 DB 里的，别让一次超时把以前抓全的数据冲掉
+        by_id = {w["work_id"]: w for w in works}
+        for d in failed:
+            old = old_works.get(d["work_id"])
+            if old is None:
+                continue
+            w = by_id[d["work_id"]]
+            reset_deep_fields(w)
+            for key in DEEP_FIELDS:
+                if key in old:
+                    w[key] = old[key]
+
+        full_data = dict(old_data)
+        full_data["account"] = {"username": current_user, "fetch_time": datetime.now().isoformat()}
+        full_data["works"] = works
+        full_data["failed_works"] = failed
+        if series_list is not None:
+            full_data["series_list"] = series_list
+        save_db(full_data, page, metrics)
+        context.close()
+
+def retry_failed_account(metrics):
+    """--retry-failed：只重抓 DB 里 failed_works 记下的作品，其余数据原样保留"""
+    from playwright.sync_api import sync_playwright
+
+    data = load_old_db()
+    if data is None:
+        return
+    dead = data.get("failed_works", [])
+    if not dead:
+        print("✅ 上次没有失败的作品，不需要重试。")
+        return
+
+    print(f"🔁 AO3 年度总结 · 重抓上次失败的 {len(dead)} 篇作品")
+    with sync_playwright() as p:
+        session = login(p, metrics)
+        if session is None:
+            return
+        context, page, current_user = session
+        if data.get("account", {}).get("username") != current_user:
+            print("❌ 当前登录的账号和数据文件不同，无法只重抓失败作品。")
+            context.close()
+            return
+
+        by_id = {w.get("work_id"): w for w in data.get("works", [])}
+        works = [by_id[d["work_id"]] for d in dead if d["work_id"] in by_id]
+        for w in works:
+            reset_deep_fields(w)
+
+        pipeline = ParsePipeline(metrics=metrics)
+        data["failed_works"] = deep_fetch(page, works, pipeline, metrics,
+                                          attempts={d["work_id"]: d.get("attempts", 0) for d in dead})
+        pipeline.close()
+
+        save_db(data, page, metrics)
+        context.close()
+
+def poll_counters(page, current_user, pipeline, metrics):
+    """watch 的一次轮询：只看 Stats 和作品列表，返回 {work_id: {kudos, hits, comments, subs, bookmarks, chapters}}
+    Stats 没抓到时返回 None：订阅/收藏全记成 0 的话，下次抓到会被当成一下子涨了很多"""
+    works = collect_skeleton(page, current_user, pipeline, metrics, require_stats=True)
+    if works is None:
+        return None
+    return {
+        w["work_id"]: {
+            "kudos": w["kudos"],
+            "hits": w["hits"],
+            "comments": w["comments_count"],
+            "subs": w["real_subs"],
+            "bookmarks": w["real_bookmarks"],
+            "chapters": parse_int(w["chapters_text"].split("/")[0]),
+        }
+        for w in works
+    }
+
+def watch_account(metrics, once=False):
+    """低成本监测：定时只抓 Stats 和作品列表，把每篇作品的计数追加进 SERIES_FILE，不做深度抓取"""
+    from playwright.sync_api import sync_playwright
+    from ao3_timeseries import SeriesWriter
+
+    writer = SeriesWriter(SERIES_FILE)
+    print("👀 AO3 年度总结 · 数据监测 (只看 Stats 和作品列表)")
+    with sync_playwright() as p:
+        session = login(p, metrics)
+        if session is None:
+            return
+        context, page, current_user = session
+
+        pipeline = ParsePipeline(metrics=metrics)
+        try:
+            while True:
+                snapshot = poll_counters(page, current_user, pipeline, metrics)
+                if snapshot is None:
+                    print(f"⚠️ {datetime.now():%m-%d %H:%M} Stats 没拿到，这次先不记录")
+                else:
+                    changed = writer.append(snapshot)
+                    print(f"📈 {datetime.now():%m-%d %H:%M} 记录了 {len(snapshot)} 篇作品，"
+                          f"{changed} 篇有变化 → {SERIES_FILE}")
+                if once:
+                    break
+                print(f"   💤 {WATCH_INTERVAL_HOURS} 小时后再看一次 (Ctrl+C 结束)")
+                metrics.begin("idle")
+                time.sleep(WATCH_INTERVAL_HOURS * 3600)
+        except KeyboardInterrupt:
+            print("\n👋 监测结束。")
+        pipeline.close()
+        metrics.end()
+
+        metrics.print_summary()
+        print(f"📈 运行数据已保存至 {metrics.write(SERIES_FILE)}")
+        context.close()
+
+RUN_MODES = {
+    "fetch": fetch_account,
+    "refresh": refresh_account,
+    "retry_failed": retry_failed_account,
+    "watch": watch_account,
+}
+
+def main(mode="fetch", **options):
+    metrics = Metrics(mode)
+    with profiling(PROFILE, DATA_FILE, metrics.label):
+        RUN_MODES[mode](metrics, **options)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    multiprocessing.freeze_support()  # 打包成 exe 后子进程需要
+    main("retry_failed" if "--retry-failed" in sys.argv[1:] else "fetch")
\ No newline at end of file
@@ -0,0 +1,218 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# 两个脚本共用的计时/计数工具：
+#   - 分阶段耗时 (登录、Stats、列表、深度抓取、保存 / 各报告模块)
+#   - 按 URL 类型统计的延迟直方图、收到的字节数、每页解析耗时
+#   - 429 重试、限速等待
+#   - 带 ETA 的进度输出
+# 结束时写成 <DB 文件名>.<fetch/analyze...>.metrics.json (抓取和分析各写各的，不会互相覆盖)，
+# 设置 AO3_PROFILE=1 还会导出 cProfile / tracemalloc 热点。
+
+PROFILE = os.environ.get("AO3_PROFILE", "") not in ("", "0")
+
+# 延迟直方图的桶 (毫秒)
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+def classify_url(url):
+    """把 URL 归到几类，方便分开看延迟"""
+    path = url.split("://", 1)[-1]
+    path = path[path.find("/"):] if "/" in path else "/"
+    path = path.split("#", 1)[0]
+    route = path.split("?", 1)[0].rstrip("/")
+    if route == "":
+        return "home"
+    if route.endswith("/stats"):
+        return "stats"
+    if "/users/" in route and route.endswith(("/works", "/collected", "/series", "/collection_items")):
+        return "list"
+    if route.endswith("/navigate"):
+        return "navigate"
+    if route.startswith("/comments"):
+        return "comments"
+    if route.startswith("/works/"):
+        return "work"
+    return "other"
+
+
+def histogram(values_ms, buckets=LATENCY_BUCKETS_MS):
+    hist = Counter()
+    for v in values_ms:
+        for b in buckets:
+            if v <= b:
+                hist[f"<={b}ms"] += 1
+                break
+        else:
+            hist[f">{buckets[-1]}ms"] += 1
+    return dict(hist)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def describe(values_ms):
+    vals = sorted(values_ms)
+    return {
+        "count": len(vals),
+        "total_ms": round(sum(vals), 1),
+        "p50_ms": round(percentile(vals, 0.5), 1),
+        "p90_ms": round(percentile(vals, 0.9), 1),
+        "max_ms": round(vals[-1], 1) if vals else 0.0,
+        "histogram": histogram(vals),
+    }
+
+
+class Metrics:
+    """一次运行的所有数字 (线程安全，解析进程池的回调线程也会写)"""
+
+    def __init__(self, label=""):
+        self.label = label
+        self.started = time.time()
+        self.phases = {}
+        self.latency = defaultdict(list)  # URL 类型 -> [毫秒]
+        self.parse = defaultdict(list)    # 解析种类 -> [毫秒]
+        self.counters = Counter()
+        self.lock = threading.Lock()
+        self._current = None
+
+    def begin(self, name):
+        """结束上一个阶段、开始新阶段 (不想为 with 多缩进一层时用)"""
+        self.end()
+        self._current = (name, time.perf_counter())
+
+    def end(self):
+        if self._current is not None:
+            name, t0 = self._current
+            self._current = None
+            self.add_phase(name, time.perf_counter() - t0)
+
+    @contextmanager
+    def phase(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - t0)
+
+    def add_phase(self, name, seconds):
+        with self.lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def record_request(self, url, seconds, nbytes=0):
+        with self.lock:
+            self.latency[classify_url(url)].append(seconds * 1000)
+            self.counters["requests"] += 1
+            self.counters["bytes_received"] += nbytes
+
+    def record_parse(self, kind, seconds):
+        with self.lock:
+            self.parse[kind].append(seconds * 1000)
+
+    def incr(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    def summary(self):
+        with self.lock:
+            return {
+                "label": self.label,
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "wall_seconds": round(time.time() - self.started, 2),
+                "phases": {k: round(v, 3) for k, v in self.phases.items()},
+                "latency": {k: describe(v) for k, v in self.latency.items()},
+                "parse": {k: describe(v) for k, v in self.parse.items()},
+                "counters": dict(self.counters),
+            }
+
+    def write(self, data_file):
+        """写到 DB 旁边，文件名带上 label：my_ao3_db.json -> my_ao3_db.fetch.metrics.json"""
+        path = labeled_path(data_file, self.label) + ".metrics.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def print_summary(self):
+        s = self.summary()
+        print("⏱️ 各阶段耗时：" + "，".join(f"{k} {v:.1f}s" for k, v in s["phases"].items()))
+        for kind, d in s["latency"].items():
+            print(f"   {kind:<9} {d['count']:>4} 次  p50 {d['p50_ms']:.0f}ms  p90 {d['p90_ms']:.0f}ms  最慢 {d['max_ms']:.0f}ms")
+        c = s["counters"]
+        if c:
+            mb = c.get("bytes_received", 0) / 1024 / 1024
+            print(f"   共 {c.get('requests', 0)} 个网页 / {mb:.1f} MB，429 重试 {c.get('retries', 0)} 次，"
+                  f"限速等待 {c.get('throttle_wait_seconds', 0):.0f}s")
+
+
+def labeled_path(data_file, label):
+    """my_ao3_db.json + "analyze" -> my_ao3_db.analyze (不带扩展名)"""
+    base = os.path.splitext(data_file)[0]
+    return f"{base}.{label}" if label else base
+
+
+def timed_call(fn, *args):
+    """在 (子进程里) 跑 fn 并顺便计时，返回 (结果, 秒)"""
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def progress(iterable, total=None, desc="", every=None):
+    """代替 tqdm 的简易进度：每隔几项打印一次 已完成/总数、用时和预计剩余时间"""
+    total = len(iterable) if total is None and hasattr(iterable, "__len__") else total
+    every = every or max(1, (total or 10) // 20)
+    t0 = time.perf_counter()
+    for i, item in enumerate(iterable, 1):
+        yield item
+        if total and (i % every == 0 or i == total):
+            elapsed = time.perf_counter() - t0
+            eta = elapsed / i * (total - i)
+            print(f"   ⏳ {desc} {i}/{total} ({i * 100 // total}%)，已用 {fmt_duration(elapsed)}，"
+                  f"预计还要 {fmt_duration(eta)}")
+
+
+def fmt_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+@contextmanager
+def profiling(enabled, data_file, label="", top=25):
+    """AO3_PROFILE=1 时用 cProfile + tracemalloc 包住整段运行，结束后导出热点"""
+    if not enabled:
+        yield
+        return
+    import cProfile
+    import io
+    import pstats
+    import tracemalloc
+
+    base = labeled_path(data_file, label)
+    prof = cProfile.Profile()
+    tracemalloc.start(10)
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        prof.dump_stats(base + ".prof")
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(top)
+        buf.write(f"\n===== tracemalloc：Python 内存峰值 {peak / 1024 / 1024:.1f} MB，分配最多的位置 =====\n")
+        for stat in snapshot.statistics("lineno")[:top]:
+            buf.write(f"{stat}\n")
+        with open(base + ".hotspots.txt", "w", encoding="utf-8") as f:
+            f.write(buf.getvalue())
+        print(f"🔬 性能剖析已导出：{base}.prof / {base}.hotspots.txt")
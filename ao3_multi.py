@@ -0,0 +1,312 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+import ao3_fetch as fetch
+from ao3_metrics import Metrics
+
+# 多账号模式：一个 Chromium，每个账号一个独立的 context，几个账号同时抓。
+#   python ao3report.py multi ao3_accounts.json
+# ao3_accounts.json：
+#   [{"name": "writer_a"}, {"name": "writer_b", "profile_dir": "profiles/b", "data_file": "b_db.json"}]
+# 每个账号的登录状态存在 <profile_dir>/storage_state.json；第一次没有时，
+# 先用这个目录开一个有界面的浏览器让对方登录一次 (和单账号的 chrome_user_data 一样)。
+#
+# Playwright 的同步 API 只能在创建它的线程里用，所以：各账号的抓取流程跑在自己的线程里，
+# 对网页的操作都交给主线程 (TabBroker) 执行。主线程发出导航后不等它加载完就去处理别的账号，
+# 没别的事可做时才等最早发出的那个，几个账号的网页因此是同时在加载的。
+
+ACCOUNTS_FILE = "ao3_accounts.json"
+PROFILES_DIR = "profiles"
+STATE_FILE_NAME = "storage_state.json"
+MULTI_REQUEST_INTERVAL = 0.5  # 所有账号加起来，两次开网页之间至少隔几秒 (共用的访问频率)
+
+
+def load_accounts(path):
+    """读账号列表，补上默认的 profile_dir / data_file；读不了返回 None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ 读不了账号列表 {path}: {e}")
+        return None
+    accounts = []
+    for item in raw:
+        if isinstance(item, str):
+            item = {"name": item}
+        name = item["name"]
+        accounts.append({
+            "name": name,
+            "profile_dir": item.get("profile_dir") or os.path.join(PROFILES_DIR, name),
+            "data_file": item.get("data_file") or f"{name}_ao3_db.json",
+        })
+    return accounts
+
+
+class TabBroker:
+    """在主线程里替各账号线程执行 Playwright 调用"""
+
+    def __init__(self, limiter):
+        self.requests = queue.Queue()
+        self.inflight = deque()  # 已经发出导航、等着 finish 的 (fn, args, kwargs, future)
+        self.limiter = limiter
+        self.waiting = 0  # 还没答复的请求数 (= 正在等主线程的账号线程数)
+        self.lock = threading.Lock()
+
+    # ---- 账号线程调用 ----
+    def call(self, fn, *args, **kwargs):
+        """马上在主线程执行，等结果"""
+        return self._request(False, fn, args, kwargs)
+
+    def defer(self, fn, *args, **kwargs):
+        """要等网页加载的操作 (finish)：排在已发出的导航后面，主线程空下来再做"""
+        return self._request(True, fn, args, kwargs)
+
+    def _request(self, deferred, fn, args, kwargs):
+        fut = Future()
+        with self.lock:
+            self.waiting += 1
+        self.requests.put((deferred, fn, args, kwargs, fut))
+        return fut.result()
+
+    def navigate(self, tab, url):
+        self.call(self._start, tab, url)
+
+    def _start(self, tab, url):
+        self.limiter.wait()
+        tab.start(url)
+
+    def wrap(self, value):
+        """Playwright 对象不能直接交给别的线程用，包一层让它的方法也回到主线程执行"""
+        if isinstance(value, fetch.BrowserTab):
+            return RemoteTab(self, value)
+        if value is None or isinstance(value, (str, bytes, int, float, bool, list, dict, tuple)):
+            return value
+        return Remote(self, value)
+
+    # ---- 主线程 ----
+    def serve(self, threads, grace=0.02):
+        """一直处理请求，直到所有账号线程都结束
+
+        手上有等着加载的网页时，只要还有账号线程在自己干活 (没在等主线程)，
+        就再等它 grace 秒，让它的导航也先发出去，几个网页一起加载。
+        """
+        while True:
+            try:
+                if not self.inflight:
+                    req = self.requests.get(timeout=0.05)
+                elif self.waiting < sum(t.is_alive() for t in threads):
+                    req = self.requests.get(timeout=grace)
+                else:
+                    req = self.requests.get_nowait()
+            except queue.Empty:
+                if self.inflight:
+                    self._run(*self.inflight.popleft())
+                elif not any(t.is_alive() for t in threads):
+                    return
+                continue
+            deferred, fn, args, kwargs, fut = req
+            if deferred:
+                self.inflight.append((fn, args, kwargs, fut))
+            else:
+                self._run(fn, args, kwargs, fut)
+
+    def _run(self, fn, args, kwargs, fut):
+        try:
+            result, error = fn(*args, **kwargs), None
+        except Exception as e:
+            result, error = None, e
+        # 先减计数再答复：答复之后那个线程就算在干活了
+        with self.lock:
+            self.waiting -= 1
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(result)
+
+
+class Remote:
+    """主线程里某个 Playwright 对象的替身：取属性、调方法都交给 broker"""
+
+    def __init__(self, broker, obj):
+        self._broker = broker
+        self._obj = obj
+
+    def __getattr__(self, name):
+        broker = self._broker
+        attr = broker.call(getattr, self._obj, name)
+        if callable(attr):
+            return lambda *args, **kwargs: broker.wrap(broker.call(attr, *args, **kwargs))
+        return broker.wrap(attr)
+
+
+class RemoteTab(Remote):
+    """账号线程里用的 BrowserTab：导航拆成 start (马上发出) + finish (排队等加载完)"""
+
+    def goto(self, url, timeout=60000, **kwargs):
+        self._broker.navigate(self._obj, url)
+        self._broker.defer(self._obj.finish, timeout)
+
+    def start(self, url):
+        self._broker.navigate(self._obj, url)
+
+    def finish(self, timeout=60000):
+        return self._broker.defer(self._obj.finish, timeout)
+
+    def wait_for_timeout(self, ms):
+        # 在账号线程里睡，主线程照样处理别的账号
+        time.sleep(ms / 1000)
+
+
+class AccountOutput:
+    """几个账号同时打印时，每行前面加上账号名 (线程名)；主线程的输出不变"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        thread = threading.current_thread()
+        if thread is threading.main_thread():
+            with self.lock:
+                return self.stream.write(text)
+        buf = getattr(self.local, "buf", "") + text
+        *lines, self.local.buf = buf.split("\n")
+        with self.lock:
+            for line in lines:
+                self.stream.write(f"[{thread.name}] {line}\n")
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def greeting_user(page):
+    """已登录时返回右上角的用户名，没登录返回 None"""
+    user_greeting = page.locator("#greeting ul.user.navigation a[href^='/users/']").first
+    if user_greeting.count() == 0:
+        return None
+    return user_greeting.get_attribute("href").split("/")[-1]
+
+
+def ensure_login_state(p, acc):
+    """账号还没有 storage_state.json 时，用它自己的目录开浏览器登录一次，把登录状态存下来"""
+    state_file = os.path.join(acc["profile_dir"], STATE_FILE_NAME)
+    if os.path.exists(state_file):
+        return True
+    print(f"\n🔑 账号 {acc['name']} 还没有登录状态，打开浏览器登录...")
+    os.makedirs(acc["profile_dir"], exist_ok=True)
+    session = fetch.login(p, Metrics(acc["name"]), user_data_dir=acc["profile_dir"])
+    if session is None:
+        return False
+    context = session[0]
+    context.storage_state(path=state_file)
+    context.close()
+    return True
+
+
+def run_account(acc, tab, pool, metrics, result):
+    """一个账号的完整抓取 (在自己的线程里跑，tab 是 RemoteTab)"""
+    t0 = time.perf_counter()
+    try:
+        metrics.begin("login")
+        tab.goto(f"{fetch.BASE_URL}/")
+        current_user = greeting_user(tab)
+        if current_user is None:
+            raise RuntimeError(f"登录状态失效，请删掉 {acc['profile_dir']}/{STATE_FILE_NAME} 重新登录")
+        print(f"✅ 当前用户: 【{current_user}】")
+        result["user"] = current_user
+
+        pipeline = fetch.ParsePipeline(metrics=metrics, pool=pool)
+        full_data = fetch.fetch_works(tab, current_user, pipeline, metrics)
+        pipeline.close()
+        fetch.save_db(full_data, tab, metrics, data_file=acc["data_file"])
+        result["works"] = len(full_data["works"])
+        result["failed"] = len(full_data["failed_works"])
+        result["status"] = "ok"
+    except Exception as e:
+        print(f"❌ 抓取中断: {e}")
+        result["status"] = f"error: {e}"
+    result["seconds"] = round(time.perf_counter() - t0, 1)
+    result["requests"] = metrics.summary()["counters"].get("requests", 0)
+
+
+def print_results(results):
+    columns = ["account", "user", "works", "failed", "seconds", "requests", "status"]
+    widths = {c: max(len(c), *(len(str(r.get(c, "-"))) for r in results)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in results:
+        print("  ".join(str(r.get(c, "-")).ljust(widths[c]) for c in columns))
+
+
+def multi_fetch(accounts):
+    """多账号同时抓取，返回每个账号的结果汇总"""
+    from playwright.sync_api import sync_playwright
+
+    print(f"🚀 AO3 年度总结 · 多账号抓取 ({len(accounts)} 个账号)")
+    results = [{"account": acc["name"], "status": "not started"} for acc in accounts]
+    with sync_playwright() as p:
+        ready = []
+        for acc, result in zip(accounts, results):
+            if ensure_login_state(p, acc):
+                ready.append((acc, result))
+            else:
+                result["status"] = "login failed"
+
+        cache_bytes = fetch.DISK_CACHE_MB * 1024 * 1024
+        browser = p.chromium.launch(headless=True, args=[f"--disk-cache-size={cache_bytes}",
+                                                         f"--media-cache-size={cache_bytes}"])
+        broker = TabBroker(fetch.RateLimiter(MULTI_REQUEST_INTERVAL))
+        workers = fetch.PARSE_WORKERS
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+
+        threads = []
+        contexts = []
+        for acc, result in ready:
+            context = browser.new_context(storage_state=os.path.join(acc["profile_dir"], STATE_FILE_NAME),
+                                          viewport={'width': 1280, 'height': 800})
+            contexts.append(context)
+            metrics = Metrics(acc["name"])
+            # 渲染进程内存是整个浏览器一起算的，上限按账号数放大
+            tab = fetch.BrowserTab(context, page=context.new_page(), metrics=metrics,
+                                   rss_limit_mb=fetch.PAGE_RSS_LIMIT_MB * len(ready))
+            threads.append(threading.Thread(target=run_account, name=acc["name"], daemon=True,
+                                            args=(acc, broker.wrap(tab), pool, metrics, result)))
+
+        with redirect_stdout(AccountOutput(sys.stdout)):
+            for t in threads:
+                t.start()
+            broker.serve(threads)
+
+        if pool is not None:
+            pool.shutdown()
+        for context in contexts:
+            context.close()
+        browser.close()
+
+    print("\n" + "=" * 50)
+    print("📋 多账号汇总")
+    print_results(results)
+    print("=" * 50)
+    return results
+
+
+def main(accounts_file=None):
+    accounts = load_accounts(accounts_file or ACCOUNTS_FILE)
+    if not accounts:
+        return 1
+    results = multi_fetch(accounts)
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main(sys.argv[1] if len(sys.argv) > 1 else None))
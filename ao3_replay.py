@@ -0,0 +1,497 @@
+import argparse
+import os
+import random
+import threading
+import time
+from datetime import date, timedelta
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# 本地 AO3 “替身”服务器：用合成的 (或录下来的) 页面模拟 AO3，
+# 让 ao3_fetch.py 不登录、不碰真网站也能跑通和测速。
+#   python ao3_replay.py --works 80 --latency-ms 150
+#   然后设置 AO3_BASE_URL=http://127.0.0.1:8765 再运行 ao3_fetch.py
+
+FANDOMS = ["原神 | Genshin Impact", "Harry Potter - J. K. Rowling", "刀剑乱舞 | Touken Ranbu", "Original Work"]
+RELATIONSHIPS = ["A/B", "B/A", "A／B", "C/D", "A & C", "E/F", "Original Male Character/Original Female Character"]
+FREEFORMS = ["Fluff", "Angst", "Hurt/Comfort", "Slow Burn", "Alternate Universe - Modern Setting",
+             "Fluff and Angst", "Happy Ending", "Canon Divergence", "Slice of Life", "Getting Together"]
+RATINGS = ["General Audiences", "Teen And Up Audiences", "Mature", "Explicit"]
+CATEGORIES = ["M/M", "F/F", "F/M", "Gen", "Multi"]
+COMMENTS_PER_PAGE = 20  # 和 AO3 一样，每页 20 串顶层评论
+COLLECTIONS = ["Yuletide 2025", "Rarepair Exchange", "中文同人合集", "Drabble Challenge", "Big Bang 2025"]
+LOREM = ("the archive keeps every word you wrote this year and every reader who stopped by "
+         "to leave a kudos or a comment under the chapter at midnight ").split()
+
+
+def make_site(works=60, username="bench_writer", seed=2025, year=2025, old_works=5,
+              max_chapters=12, comments_per_work=30, kudos_per_work=60, words_per_chapter=2000,
+              collected_share=0.2, anon_share=0.1, hidden_share=0.05, readers=200):
+    """生成一个合成账号：works 篇 year 年的作品 + old_works 篇更早的作品 (用来触发年份截止)"""
+    rng = random.Random(seed)
+    reader_names = [f"reader{i:03d}" for i in range(readers)]
+    comment_id = 100000
+    site_works = []
+    start = date(year, 1, 1)
+    for n in range(works + old_works):
+        wid = str(50000000 + n)
+        old = n >= works
+        n_chapters = rng.randint(1, max_chapters) if rng.random() < 0.4 else 1
+        first = start + timedelta(days=rng.randint(0, 300)) - (timedelta(days=400) if old else timedelta(0))
+        chapters = []
+        day = first
+        for c in range(1, n_chapters + 1):
+            chapters.append({"title": f"Chapter {c}" if rng.random() < 0.5 else f"第{c}章", "date": day})
+            day += timedelta(days=rng.randint(1, 20))
+
+        r = rng.random()
+        w_type = "Anonymous" if r < anon_share else "Unrevealed" if r < anon_share + hidden_share else "Normal"
+
+        kudos = rng.sample(reader_names, min(len(reader_names), max(0, int(rng.gauss(kudos_per_work, kudos_per_work / 3)))))
+
+        comments = []
+        for _ in range(max(0, int(rng.gauss(comments_per_work, comments_per_work / 3)))):
+            comment_id += 1
+            node = {"id": comment_id, "user": rng.choice(reader_names + ["Guest"]),
+                    "chapter": rng.randint(1, n_chapters), "replies": []}
+            # 一部分评论下面挂作者回复，再挂读者回复
+            parent = node
+            for depth in range(rng.choice([0, 0, 1, 2, 3])):
+                comment_id += 1
+                reply = {"id": comment_id, "user": username if depth % 2 == 0 else node["user"],
+                         "chapter": node["chapter"], "replies": []}
+                parent["replies"].append(reply)
+                parent = reply
+            comments.append(node)
+        n_comments = sum(1 + count_replies(c) for c in comments)
+
+        site_works.append({
+            "id": wid,
+            "title": f"Bench Work {n}",
+            "type": w_type,
+            "rating": rng.choice(RATINGS),
+            "categories": rng.sample(CATEGORIES, rng.randint(1, 2)),
+            "fandoms": rng.sample(FANDOMS, rng.randint(1, 2)),
+            "relationships": rng.sample(RELATIONSHIPS, rng.randint(0, 3)),
+            "freeforms": rng.sample(FREEFORMS, rng.randint(1, 6)),
+            "chapters": chapters,
+            "total_chapters": n_chapters if rng.random() < 0.7 else None,
+            "words": words_per_chapter * n_chapters,
+            "updated": chapters[-1]["date"],
+            "kudos": kudos,
+            "comments": comments,
+            "comments_count": n_comments,
+            "hits": len(kudos) * rng.randint(5, 15),
+            "subs": rng.randint(0, 30) if n_chapters > 1 else 0,
+            "bookmarks": rng.randint(0, 40),
+            "collected": rng.random() < collected_share,
+            "adult": False,
+        })
+    site_works.sort(key=lambda w: w["updated"], reverse=True)
+
+    # 系列和合集用另一个随机数发生器，上面生成的作品和以前完全一样
+    rng = random.Random(seed + 1)
+    series = []
+    for w in sorted(site_works, key=lambda w: w["chapters"][0]["date"]):
+        w["series"] = None
+        if rng.random() < 0.3:
+            if not series or rng.random() < 0.4:
+                series.append({"id": str(7000 + len(series)), "title": f"Bench Series {len(series)}",
+                               "works": [], "bookmarks": rng.randint(0, 50)})
+                s = series[-1]
+            else:
+                s = rng.choice(series)
+            s["works"].append(w)
+            w["series"] = (s, len(s["works"]))
+        w["collections"] = rng.sample(COLLECTIONS, rng.randint(1, 2)) if w["collected"] else []
+    return {"username": username, "year": year, "works": site_works, "series": series,
+            "by_id": {w["id"]: w for w in site_works}}
+
+
+def count_replies(node):
+    return sum(1 + count_replies(r) for r in node["replies"])
+
+
+def fmt_date(d):
+    return d.strftime("%d %b %Y")
+
+
+def lorem(words, seed):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(LOREM) for _ in range(words))
+
+
+def page_shell(body, username=None):
+    greeting = ""
+    if username:
+        greeting = (f'<ul class="user navigation actions"><li><a href="/users/{username}">'
+                    f'Hi, {username}!</a></li></ul>')
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Archive of Our Own</title></head>'
+            f'<body><div id="header"><div id="greeting">{greeting}</div></div>'
+            f'<div id="main">{body}</div></body></html>')
+
+
+def pagination(path, page_num, total_pages):
+    if total_pages <= 1:
+        return ""
+    nxt = (f'<li class="next"><a rel="next" href="{path}?page={page_num + 1}">Next →</a></li>'
+           if page_num < total_pages else '<li class="next"><span class="disabled">Next →</span></li>')
+    return f'<ol class="pagination actions" role="navigation">{nxt}</ol>'
+
+
+def render_blurb(w, username):
+    status = ""
+    if w["type"] == "Anonymous":
+        status = ' <span class="status">(Anonymous)</span>'
+    elif w["type"] == "Unrevealed":
+        status = ' <span class="status">(Unrevealed)</span>'
+    total = w["total_chapters"] if w["total_chapters"] else "?"
+    tags = "".join(f'<li class="relationships"><a class="tag">{escape(r)}</a></li>' for r in w["relationships"])
+    tags += "".join(f'<li class="freeforms"><a class="tag">{escape(t)}</a></li>' for t in w["freeforms"])
+    cats = "".join(f'<li><span class="category" title="{escape(c)}"><span class="text">{escape(c)}</span></span></li>'
+                   for c in w["categories"])
+    series = ""
+    if w.get("series"):
+        s, part = w["series"]
+        series = (f'<h6 class="landmark heading">Series</h6><ul class="series"><li>Part <strong>{part}</strong>'
+                  f' of <a href="/series/{s["id"]}">{escape(s["title"])}</a></li></ul>')
+    return (
+        f'<li class="own work blurb group" id="work_{w["id"]}" role="article">'
+        f'<div class="header module"><h4 class="heading"><a href="/works/{w["id"]}">{escape(w["title"])}</a>'
+        f' by <a rel="author" href="/users/{username}">{username}</a>{status}</h4>'
+        f'<h5 class="fandoms heading">{"".join(f"<a class=tag>{escape(f)}</a> " for f in w["fandoms"])}</h5>'
+        f'<ul class="required-tags"><li><span class="rating" title="{w["rating"]}"><span class="text">'
+        f'{w["rating"]}</span></span></li>{cats}</ul>'
+        f'<p class="datetime">{fmt_date(w["updated"])}</p></div>'
+        f'<ul class="tags commas">{tags}</ul>{series}'
+        f'<dl class="stats"><dt class="words">Words:</dt><dd class="words">{w["words"]:,}</dd>'
+        f'<dt class="chapters">Chapters:</dt><dd class="chapters">{len(w["chapters"])}/{total}</dd>'
+        f'<dt class="comments">Comments:</dt><dd class="comments">{w["comments_count"]}</dd>'
+        f'<dt class="kudos">Kudos:</dt><dd class="kudos">{len(w["kudos"])}</dd>'
+        f'<dt class="hits">Hits:</dt><dd class="hits">{w["hits"]:,}</dd></dl></li>'
+    )
+
+
+def render_work_list(site, path, works, page_num, per_page=20):
+    total_pages = max(1, (len(works) + per_page - 1) // per_page)
+    chunk = works[(page_num - 1) * per_page: page_num * per_page]
+    body = (f'<h2 class="heading">{len(works)} Works by {site["username"]}</h2>'
+            f'<ol class="work index group">{"".join(render_blurb(w, site["username"]) for w in chunk)}</ol>'
+            f'{pagination(path, page_num, total_pages)}')
+    return page_shell(body, site["username"])
+
+
+def render_series_list(site, path, page_num, per_page=20):
+    series = site["series"]
+    total_pages = max(1, -(-len(series) // per_page))
+    items = "".join(
+        f'<li class="series blurb group" id="series_{s["id"]}" role="article"><div class="header module">'
+        f'<h4 class="heading"><a href="/series/{s["id"]}">{escape(s["title"])}</a> by '
+        f'<a rel="author" href="/users/{site["username"]}">{site["username"]}</a></h4>'
+        f'<p class="datetime">{fmt_date(max(w["updated"] for w in s["works"]))}</p></div>'
+        f'<dl class="stats"><dt class="words">Words:</dt><dd class="words">{sum(w["words"] for w in s["works"]):,}</dd>'
+        f'<dt class="works">Works:</dt><dd class="works">{len(s["works"])}</dd>'
+        f'<dt class="bookmarks">Bookmarks:</dt><dd class="bookmarks"><a href="/series/{s["id"]}/bookmarks">'
+        f'{s["bookmarks"]}</a></dd></dl></li>'
+        for s in series[(page_num - 1) * per_page: page_num * per_page]
+    )
+    body = (f'<h2 class="heading">{len(series)} Series by {site["username"]}</h2>'
+            f'<ul class="series index group">{items}</ul>{pagination(path, page_num, total_pages)}')
+    return page_shell(body, site["username"])
+
+
+def render_collection_items(site, path, page_num, per_page=20):
+    rows = [(w, c) for w in site["works"] for c in w["collections"]]
+    total_pages = max(1, -(-len(rows) // per_page))
+    items = "".join(
+        f'<li class="collection item group"><div class="header module"><h4 class="heading">'
+        f'<a href="/works/{w["id"]}">{escape(w["title"])}</a></h4></div>'
+        f'<dl class="meta"><dt>Collection:</dt><dd><a href="/collections/c{COLLECTIONS.index(c)}">{escape(c)}</a></dd>'
+        f'<dt>Status:</dt><dd>Approved</dd></dl></li>'
+        for w, c in rows[(page_num - 1) * per_page: page_num * per_page]
+    )
+    body = (f'<h2 class="heading">Approved Collection Items</h2>'
+            f'<ul class="collection index group">{items}</ul>{pagination(path, page_num, total_pages)}')
+    return page_shell(body, site["username"])
+
+
+def render_stats(site, year):
+    rows = []
+    for w in site["works"]:
+        if year and w["updated"].year != year:
+            continue
+        rows.append(
+            f'<li><dl class="stats"><dt><a href="/works/{w["id"]}">{escape(w["title"])}</a>'
+            f' <span class="words">({w["words"]:,} words)</span></dt><dd><dl class="stats">'
+            f'<dt class="subscriptions">Subscriptions:</dt><dd class="subscriptions">{w["subs"]}</dd>'
+            f'<dt class="hits">Hits:</dt><dd class="hits">{w["hits"]:,}</dd>'
+            f'<dt class="kudos">Kudos:</dt><dd class="kudos">{len(w["kudos"])}</dd>'
+            f'<dt class="comments">Comment Threads:</dt><dd class="comments">{len(w["comments"])}</dd>'
+            f'<dt class="bookmarks">Bookmarks:</dt><dd class="bookmarks">{w["bookmarks"]}</dd>'
+            f'</dl></dd></dl></li>'
+        )
+    body = f'<h2 class="heading">Stats</h2><ul class="statistics index group">{"".join(rows)}</ul>'
+    return page_shell(body, site["username"])
+
+
+def render_navigate(site, w):
+    items = "".join(
+        f'<li><a href="/works/{w["id"]}/chapters/{i}">{i}. {escape(c["title"])}</a> '
+        f'<span class="datetime">({c["date"].isoformat()})</span></li>'
+        for i, c in enumerate(w["chapters"], 1)
+    )
+    return page_shell(f'<h2 class="heading">Chapter Index</h2><ol class="chapter index group">{items}</ol>',
+                      site["username"])
+
+
+def render_comment_thread(nodes):
+    parts = []
+    for c in nodes:
+        user = ('<a href="/users/{0}">{0}</a>'.format(c["user"]) if c["user"] != "Guest"
+                else '<span>Guest</span>')
+        parts.append(
+            f'<li class="comment group" id="comment_{c["id"]}"><h4 class="heading byline">{user} '
+            f'on Chapter {c["chapter"]}</h4><span class="posted datetime">Mon 01 Dec 2025 12:00AM</span>'
+            f'<blockquote class="userstuff"><p>{lorem(40, c["id"])}</p></blockquote></li>'
+        )
+        if c["replies"]:
+            parts.append(f'<li class="comment group even"><ol class="thread">'
+                         f'{render_comment_thread(c["replies"])}</ol></li>')
+    return "".join(parts)
+
+
+def render_comments(w, page_num):
+    """第 page_num 页评论 (按时间先后，每页 COMMENTS_PER_PAGE 串)，多于一页时带翻页链接"""
+    total_pages = max(1, -(-len(w["comments"]) // COMMENTS_PER_PAGE))
+    threads = w["comments"][(page_num - 1) * COMMENTS_PER_PAGE:page_num * COMMENTS_PER_PAGE]
+    pager = ""
+    if total_pages > 1:
+        links = "".join(
+            f'<li><a href="/comments/show_comments?page={n}&amp;work_id={w["id"]}">{n}</a></li>'
+            if n != page_num else f'<li><span class="current">{n}</span></li>'
+            for n in range(1, total_pages + 1)
+        )
+        pager = f'<ol class="pagination actions" role="navigation">{links}</ol>'
+    return (f'<div id="comments_placeholder"><ol class="thread">{render_comment_thread(threads)}</ol>'
+            f'{pager}</div>')
+
+
+def render_full_work(site, w, words_per_chapter):
+    chapters = "".join(
+        f'<div class="chapter" id="chapter-{i}"><h3 class="title">{escape(c["title"])}</h3>'
+        f'<div class="userstuff module">{lorem(words_per_chapter, int(w["id"]) * 100 + i)}</div></div>'
+        for i, c in enumerate(w["chapters"], 1)
+    )
+    kudos = ", ".join(f'<a href="/users/{u}">{u}</a>' for u in w["kudos"])
+    body = (
+        f'<dl class="work meta group"><dt class="published">Published:</dt>'
+        f'<dd class="published">{w["chapters"][0]["date"].isoformat()}</dd></dl>'
+        f'<div id="workskin"><h2 class="title heading">{escape(w["title"])}</h2><div id="chapters">{chapters}</div></div>'
+        f'<div id="feedback"><div id="kudos"><p class="kudos">{kudos} left kudos on this work!</p></div>'
+        f'{render_comments(w, 1)}</div>'
+    )
+    return page_shell(body, site["username"])
+
+
+def render_proceed(path, query):
+    sep = "&" if query else ""
+    return page_shell(
+        '<p class="caution">This work could have adult content. If you continue, you have agreed '
+        f'that you are willing to see such content.</p><a href="{path}?{query}{sep}proceed=1">Proceed</a>')
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """本地 AO3 替身：按路径生成页面，统计请求数和发出的字节数"""
+
+    daemon_threads = True
+
+    def __init__(self, addr, site, latency_ms=0, rate_429=0.0, proceed_every=0,
+                 words_per_chapter=2000, pages_dir=None, seed=0):
+        super().__init__(addr, ReplayHandler)
+        self.site = site
+        self.latency = latency_ms / 1000.0
+        self.rate_429 = rate_429
+        self.proceed_every = proceed_every
+        self.words_per_chapter = words_per_chapter
+        self.pages_dir = pages_dir
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.throttled = 0
+        self.cache = {}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, nbytes, throttled=False):
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += nbytes
+            if throttled:
+                self.throttled += 1
+
+    def stats(self):
+        with self.lock:
+            return {"requests": self.requests, "bytes_sent": self.bytes_sent, "throttled": self.throttled}
+
+    def roll(self):
+        with self.lock:
+            return self.rng.random()
+
+    def cached(self, key, build):
+        page = self.cache.get(key)
+        if page is None:
+            page = self.cache[key] = build().encode("utf-8")
+        return page
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        if srv.latency:
+            time.sleep(srv.latency * (0.5 + srv.roll()))
+        if srv.rate_429 and srv.roll() < srv.rate_429:
+            return self.send_page(b"<html><body><p>Retry later</p></body></html>", status=429,
+                                  headers={"Retry-After": "1"}, throttled=True)
+
+        parts = urlsplit(self.path)
+        path, query = parts.path, parts.query
+        recorded = self.recorded(path, query)
+        if recorded is not None:
+            return self.send_page(recorded)
+        try:
+            result = self.route(path, query)
+        except Exception as e:
+            return self.send_page(f"<html><body>500 {escape(str(e))}</body></html>".encode(), status=500)
+        if result is None:
+            return self.send_page(b"<html><body>404</body></html>", status=404)
+        if isinstance(result, tuple):
+            # 重定向 (例如单章作品的 /navigate)
+            return self.send_page(b"", status=302, headers={"Location": result[1]})
+        return self.send_page(result)
+
+    def recorded(self, path, query):
+        """--pages 目录里有录下来的页面就直接回放：/users/x/works?page=2 -> users/x/works__page=2.html"""
+        if not self.server.pages_dir:
+            return None
+        name = path.strip("/") or "index"
+        if query:
+            name += "__" + query.replace("&", "_")
+        file_path = os.path.join(self.server.pages_dir, name + ".html")
+        if not os.path.isfile(file_path):
+            return None
+        with open(file_path, "rb") as f:
+            return f.read()
+
+    def route(self, path, query):
+        srv = self.server
+        site = srv.site
+        params = parse_qs(query)
+        page_num = int(params.get("page", ["1"])[0] or 1)
+        user_prefix = f"/users/{site['username']}"
+        segs = [s for s in path.split("/") if s]
+
+        if path == "/":
+            return srv.cached("/", lambda: page_shell("<p>Welcome</p>", site["username"]))
+        if path == f"{user_prefix}/stats":
+            year = int(params.get("year", ["0"])[0] or 0)
+            return srv.cached(("stats", year), lambda: render_stats(site, year))
+        if path == f"{user_prefix}/works":
+            return srv.cached(("works", page_num),
+                              lambda: render_work_list(site, path, site["works"], page_num))
+        if path == f"{user_prefix}/works/collected":
+            collected = [w for w in site["works"] if w["collected"]]
+            return srv.cached(("collected", page_num),
+                              lambda: render_work_list(site, path, collected, page_num))
+        if path == f"{user_prefix}/series":
+            return srv.cached(("series", page_num), lambda: render_series_list(site, path, page_num))
+        if path == f"{user_prefix}/collection_items":
+            return srv.cached(("collection_items", page_num),
+                              lambda: render_collection_items(site, path, page_num))
+        if path == "/comments/show_comments":
+            w = site["by_id"].get(params.get("work_id", [""])[0])
+            if w is None:
+                return None
+            return srv.cached(("comments", w["id"], page_num),
+                              lambda: page_shell(render_comments(w, page_num), site["username"]))
+        if len(segs) >= 2 and segs[0] == "works" and segs[1] in site["by_id"]:
+            w = site["by_id"][segs[1]]
+            if len(segs) == 3 and segs[2] == "navigate":
+                if len(w["chapters"]) == 1:
+                    return ("redirect", f"/works/{w['id']}")
+                return srv.cached(("nav", w["id"]), lambda: render_navigate(site, w))
+            if len(segs) == 2:
+                idx = site["works"].index(w)
+                if srv.proceed_every and idx % srv.proceed_every == 0 and "proceed" not in params:
+                    return render_proceed(path, query).encode("utf-8")
+                return srv.cached(("work", w["id"]), lambda: render_full_work(site, w, srv.words_per_chapter))
+        return None
+
+    def send_page(self, body, status=200, headers=None, throttled=False):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(len(body), throttled=throttled)
+
+
+def start_server(host="127.0.0.1", port=0, latency_ms=0, rate_429=0.0, proceed_every=0,
+                 pages_dir=None, **site_kwargs):
+    """在后台线程启动替身服务器，返回 server (server.base_url 即地址)"""
+    site = make_site(**site_kwargs)
+    server = ReplayServer((host, port), site, latency_ms=latency_ms, rate_429=rate_429,
+                          proceed_every=proceed_every,
+                          words_per_chapter=site_kwargs.get("words_per_chapter", 2000),
+                          pages_dir=pages_dir, seed=site_kwargs.get("seed", 2025))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="本地 AO3 替身服务器 (合成/回放页面)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--works", type=int, default=60, help="目标年份的作品数")
+    ap.add_argument("--old-works", type=int, default=5, help="更早年份的作品数")
+    ap.add_argument("--comments", type=int, default=30, help="每篇作品平均评论串数")
+    ap.add_argument("--kudos", type=int, default=60, help="每篇作品平均 kudos 数")
+    ap.add_argument("--max-chapters", type=int, default=12)
+    ap.add_argument("--words-per-chapter", type=int, default=2000)
+    ap.add_argument("--latency-ms", type=int, default=0, help="每个请求的平均延迟")
+    ap.add_argument("--rate-429", type=float, default=0.0, help="随机返回 429 的比例 (0~1)")
+    ap.add_argument("--proceed-every", type=int, default=0, help="每 N 篇作品出现一次 Proceed 确认页")
+    ap.add_argument("--pages", default=None, help="录制页面目录，存在的页面优先回放")
+    ap.add_argument("--user", default="bench_writer")
+    ap.add_argument("--seed", type=int, default=2025)
+    args = ap.parse_args()
+
+    server = start_server(
+        host=args.host, port=args.port, latency_ms=args.latency_ms, rate_429=args.rate_429,
+        proceed_every=args.proceed_every, pages_dir=args.pages,
+        works=args.works, old_works=args.old_works, username=args.user, seed=args.seed,
+        max_chapters=args.max_chapters, comments_per_work=args.comments,
+        kudos_per_work=args.kudos, words_per_chapter=args.words_per_chapter,
+    )
+    print(f"🧪 AO3 替身服务器已启动：{server.base_url}")
+    print(f"   运行抓取前设置环境变量 AO3_BASE_URL={server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
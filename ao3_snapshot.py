@@ -0,0 +1,478 @@
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from datetime import date
+from functools import lru_cache
+
+# 分析用的列式快照：my_ao3_db.json 旁边的 my_ao3_db.snap。
+# 抓取保存 DB 时顺便写一份 (或者 python ao3_snapshot.py my_ao3_db.json 转换)，
+# 分析时 mmap 打开，只有报告真正读到的列才会从磁盘读进来，不用先 json.load 整个 DB。
+#
+# 文件结构：
+#   b"AO3SNAP1" | 表头长度 (uint64) | 表头 JSON | 各列的原始数组 (每列 8 字节对齐)
+# 表头里有账号信息、作品数、每个字段怎么存、每列的类型/位置/长度，以及对应的 .json 的大小和修改时间
+# (.json 改过而快照没跟着更新时，分析会退回读 .json)。
+#   - 数字 (words/kudos/...)：每篇一个 int64
+#   - 日期：每篇一个 int32，正数是 date.toordinal()；不是 YYYY-MM-DD 的写法存进字符串池，记成负数
+#   - 字符串 (标题等)：所有字符串去重后放进一个字符串池 (拼接的 UTF-8 + 偏移数组)，列里存池里的编号
+#   - 标签、kudos 名单：每篇的起止偏移 + 一整列扁平的字符串编号
+#   - 章节、评论树：每篇的起止偏移 + 每个子字段一整列
+# 不在上面的字段、或者类型对不上的值，整篇作品的这些字段合成一段 JSON 存进池里 (extra 列)，不会丢数据。
+
+SNAPSHOT_MAGIC = b"AO3SNAP1"
+SNAPSHOT_VERSION = 1
+
+INT_FIELDS = ("words", "kudos", "hits", "comments_count", "bookmarks", "real_subs", "real_bookmarks",
+              "series_part")
+DATE_FIELDS = ("first_published",)
+STR_FIELDS = ("work_id", "title", "url", "work_type", "rating", "status", "chapters_text", "date_updated",
+              "series_name")
+LIST_FIELDS = ("fandoms", "relationships", "freeform_tags", "categories", "kudos_givers",
+               "collections_info")
+# 列表里每条记录的子字段：i = 整数，s = 字符串，d = 日期
+RECORD_FIELDS = {
+    "chapters_detail": (("chapter_index", "i"), ("chapter_title", "s"), ("publish_date", "d")),
+    "comments_tree": (("id", "s"), ("parent_id", "s"), ("user", "s"), ("chapter_index", "i"),
+                      ("chapter_name", "s"), ("date", "s"), ("text", "s")),
+    "commenters": (("user", "s"), ("chapter_index", "i")),
+    "series": (("series_id", "s"), ("title", "s"), ("part", "i")),
+}
+
+# 哨兵值：字段不存在 / 值是 None
+INT_ABSENT, INT_NONE = -2 ** 63, -2 ** 63 + 1
+STR_ABSENT, STR_NONE = -1, -2
+DATE_ABSENT, DATE_NONE = -2 ** 31, 0
+ABSENT = {"i": INT_ABSENT, "s": STR_ABSENT, "d": DATE_ABSENT}
+TYPECODES = {"i": "q", "s": "i", "d": "i"}
+ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def snapshot_path(json_path):
+    return os.path.splitext(json_path)[0] + ".snap"
+
+
+def _source_stat(json_path):
+    st = os.stat(json_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+# ================= 写 =================
+
+class _Unfit(Exception):
+    """这个值不能按列存，放进 extra"""
+
+
+class _StringPool:
+    def __init__(self):
+        self.ids = {}
+        self.offsets = array("Q", [0])
+        self.data = bytearray()
+
+    def add(self, s):
+        sid = self.ids.get(s)
+        if sid is None:
+            sid = self.ids[s] = len(self.offsets) - 1
+            self.data += s.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return sid
+
+
+def _encoder(pool, kind):
+    """子字段种类 -> 把一个值编成整数的函数 (值不合适时抛 _Unfit)"""
+    def enc_int(v):
+        if v is None:
+            return INT_NONE
+        if type(v) is not int or not INT_NONE < v < 2 ** 63:
+            raise _Unfit
+        return v
+
+    def enc_str(v):
+        if v is None:
+            return STR_NONE
+        if not isinstance(v, str):
+            raise _Unfit
+        return pool.add(v)
+
+    def enc_date(v):
+        if v is None:
+            return DATE_NONE
+        if not isinstance(v, str):
+            raise _Unfit
+        if ISO_DATE_RE.fullmatch(v):
+            try:
+                return date.fromisoformat(v).toordinal()
+            except ValueError:
+                pass
+        return -pool.add(v) - 1
+
+    return {"i": enc_int, "s": enc_str, "d": enc_date}[kind]
+
+
+def write_snapshot(data, path, source=None):
+    """把 DB (dict) 写成快照；source 是对应的 .json 路径，记下它的大小和修改时间用来判断快照是否过期"""
+    works = data.get("works") or []
+    pool = _StringPool()
+    enc = {k: _encoder(pool, k) for k in "isd"}
+    cols = {}
+    fields = {}
+    for name in INT_FIELDS:
+        fields[name] = ["scalar", "i"]
+        cols["col." + name] = array("q")
+    for name in DATE_FIELDS:
+        fields[name] = ["scalar", "d"]
+        cols["col." + name] = array("i")
+    for name in STR_FIELDS:
+        fields[name] = ["scalar", "s"]
+        cols["col." + name] = array("i")
+    for name in LIST_FIELDS:
+        fields[name] = ["list", "s"]
+        cols[f"list.{name}.offsets"] = array("Q", [0])
+        cols[f"list.{name}.items"] = array("i")
+    for name, subs in RECORD_FIELDS.items():
+        fields[name] = ["records", [list(s) for s in subs]]
+        cols[f"rec.{name}.offsets"] = array("Q", [0])
+        for sub, kind in subs:
+            cols[f"rec.{name}.{sub}"] = array(TYPECODES[kind])
+    extra_col = cols["extra"] = array("i")
+
+    for i, w in enumerate(works):
+        extra = {k: v for k, v in w.items() if k not in fields}
+        for name, (shape, spec) in fields.items():
+            value = w.get(name, _Unfit)
+            try:
+                if value is _Unfit:
+                    raise _Unfit
+                if shape == "scalar":
+                    cols["col." + name].append(enc[spec](value))
+                elif shape == "list":
+                    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                        raise _Unfit
+                    col = cols[f"list.{name}.items"]
+                    col.extend(pool.add(v) for v in value)
+                    cols[f"list.{name}.offsets"].append(len(col))
+                else:
+                    rows = _encode_records(value, spec, enc)
+                    for (sub, _), values in zip(spec, rows):
+                        cols[f"rec.{name}.{sub}"].extend(values)
+                    offsets = cols[f"rec.{name}.offsets"]
+                    offsets.append(offsets[-1] + len(value))
+            except _Unfit:
+                if value is not _Unfit:
+                    extra[name] = value
+                if shape == "scalar":
+                    cols["col." + name].append(ABSENT[spec])
+                else:
+                    # 不存在 / 放进 extra 的列表记成空，读的时候靠 absent 列区分
+                    offsets = cols[f"{'list' if shape == 'list' else 'rec'}.{name}.offsets"]
+                    offsets.append(offsets[-1])
+                    cols.setdefault(f"absent.{name}", array("B", bytes(len(works))))[i] = 1
+        extra_col.append(pool.add(json.dumps(extra, ensure_ascii=False)) if extra else STR_ABSENT)
+
+    cols["pool.offsets"] = pool.offsets
+    cols["pool.data"] = pool.data
+
+    layout = {}
+    pos = 0
+    for name, col in cols.items():
+        typecode = col.typecode if isinstance(col, array) else "B"
+        count = len(col)
+        layout[name] = [typecode, pos, count]
+        pos += -(-count * struct.calcsize(typecode) // 8) * 8
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "meta": {k: v for k, v in data.items() if k != "works"},
+        "n_works": len(works),
+        "fields": fields,
+        "columns": layout,
+        "source": _source_stat(source) if source else None,
+    }
+    head = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(SNAPSHOT_MAGIC + struct.pack("<Q", len(head)) + head)
+        f.write(b"\0" * (-f.tell() % 8))
+        for name, col in cols.items():
+            raw = col.tobytes() if isinstance(col, array) else bytes(col)
+            f.write(raw + b"\0" * (-len(raw) % 8))
+    os.replace(tmp, path)
+    return path
+
+
+def _encode_records(value, spec, enc):
+    """一列记录 -> 每个子字段一串整数；记录的键必须刚好是 spec 里那几个"""
+    if not isinstance(value, list):
+        raise _Unfit
+    keys = {sub for sub, _ in spec}
+    rows = [[] for _ in spec]
+    for rec in value:
+        if not isinstance(rec, Mapping) or rec.keys() != keys:
+            raise _Unfit
+        for out, (sub, kind) in zip(rows, spec):
+            out.append(enc[kind](rec[sub]))
+    return rows
+
+
+def convert(json_path):
+    """已有的 .json -> 旁边的 .snap，返回快照路径"""
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return write_snapshot(data, snapshot_path(json_path), source=json_path)
+
+
+# ================= 读 =================
+
+class Snapshot:
+    """mmap 打开的快照；列在第一次用到时才建 memoryview，不复制数据"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:8] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} 不是 AO3 快照")
+        (head_len,) = struct.unpack_from("<Q", self.mm, 8)
+        self.header = json.loads(self.mm[16:16 + head_len].decode("utf-8"))
+        if self.header.get("version") != SNAPSHOT_VERSION or self.header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{path} 的版本或字节序不对")
+        self.base = 16 + head_len + (-(16 + head_len) % 8)
+        self.fields = self.header["fields"]
+        self.n_works = self.header["n_works"]
+        self._cols = {}
+        self.pool_offsets = self.col("pool.offsets")
+        self.pool_start = self.base + self.header["columns"]["pool.data"][1]
+        self.string = lru_cache(maxsize=1 << 16)(self._string)
+
+    def col(self, name):
+        c = self._cols.get(name)
+        if c is None:
+            spec = self.header["columns"].get(name)
+            if spec is None:
+                return None
+            typecode, offset, count = spec
+            start = self.base + offset
+            c = self._cols[name] = memoryview(self.mm)[start:start + count * struct.calcsize(typecode)].cast(typecode)
+        return c
+
+    def _string(self, sid):
+        offsets, start = self.pool_offsets, self.pool_start
+        return self.mm[start + offsets[sid]:start + offsets[sid + 1]].decode("utf-8")
+
+    def is_fresh(self, json_path):
+        """快照是不是从现在这个 .json 生成的 (.json 不在了也算)"""
+        if not os.path.exists(json_path):
+            return True
+        return self.header.get("source") == _source_stat(json_path)
+
+    def _decode(self, kind, v):
+        if kind == "i":
+            return None if v == INT_NONE else v
+        if kind == "s":
+            return None if v == STR_NONE else self.string(v)
+        if v == DATE_NONE:
+            return None
+        return date.fromordinal(v).isoformat() if v > 0 else self.string(-v - 1)
+
+    def _decode_many(self, kind, values):
+        if kind == "i":
+            return [None if v == INT_NONE else v for v in values]
+        if kind == "s":
+            string = self.string
+            return [None if v == STR_NONE else string(v) for v in values]
+        return [self._decode(kind, v) for v in values]
+
+    def _absent(self, i, name):
+        col = self.col(f"absent.{name}")
+        return col is not None and col[i]
+
+    def value(self, i, name):
+        """第 i 篇作品的一个字段；不存在时抛 KeyError"""
+        spec = self.fields.get(name)
+        if spec is None:
+            return self.extra(i)[name]
+        shape, kind = spec
+        if shape == "scalar":
+            v = self.col("col." + name)[i]
+            if v == ABSENT[kind]:
+                return self.extra(i)[name]
+            return self._decode(kind, v)
+        if self._absent(i, name):
+            return self.extra(i)[name]
+        prefix = "list" if shape == "list" else "rec"
+        offsets = self.col(f"{prefix}.{name}.offsets")
+        start, end = offsets[i], offsets[i + 1]
+        if shape == "list":
+            return [self.string(sid) for sid in self.col(f"list.{name}.items")[start:end]]
+        # 记录先不解码，哪个子字段被读到了再整段解码那一列 (评论正文之类没人看的就一直不碰)
+        block = _RecordBlock(self, name, kind, start, end)
+        return [SnapshotRecord(block, j) for j in range(end - start)]
+
+    def has(self, i, name):
+        """第 i 篇作品有没有这个字段 (不解码)"""
+        spec = self.fields.get(name)
+        if spec is not None:
+            if spec[0] == "scalar":
+                present = self.col("col." + name)[i] != ABSENT[spec[1]]
+            else:
+                present = not self._absent(i, name)
+            if present:
+                return True
+        return name in self.extra(i)
+
+    def extra(self, i):
+        sid = self.col("extra")[i]
+        return {} if sid == STR_ABSENT else json.loads(self.string(sid))
+
+    def keys(self, i):
+        names = [name for name in self.fields if self.has(i, name)]
+        return names + [k for k in self.extra(i) if k not in self.fields]
+
+    def works(self):
+        return [SnapshotWork(self, i) for i in range(self.n_works)]
+
+    def data(self):
+        """和 json.load 出来的 DB 一样的结构，只是 works 里是按需读取的 SnapshotWork"""
+        data = dict(self.header["meta"])
+        data["works"] = self.works()
+        return data
+
+
+_MISSING = object()
+
+
+class SnapshotWork(Mapping):
+    """快照里的一篇作品：用起来像只读的 dict，取哪个字段才读哪一列，读过的字段记下来不再解码"""
+
+    __slots__ = ("_snap", "_i", "_cache")
+
+    def __init__(self, snap, i):
+        self._snap = snap
+        self._i = i
+        self._cache = {}
+
+    def _load(self, key):
+        try:
+            v = self._snap.value(self._i, key)
+        except KeyError:
+            v = _MISSING
+        self._cache[key] = v
+        return v
+
+    def __getitem__(self, key):
+        try:
+            v = self._cache[key]
+        except KeyError:
+            v = self._load(key)
+        if v is _MISSING:
+            raise KeyError(key)
+        return v
+
+    def get(self, key, default=None):
+        try:
+            v = self._cache[key]
+        except KeyError:
+            v = self._load(key)
+        return default if v is _MISSING else v
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self):
+        return iter(self._snap.keys(self._i))
+
+    def __len__(self):
+        return len(self._snap.keys(self._i))
+
+    def __repr__(self):
+        return f"<SnapshotWork #{self._i} {self.get('work_id')}>"
+
+
+class _RecordBlock:
+    """一篇作品某个记录字段 (章节 / 评论树 …) 的那一段；子字段按列解码，解码过的留着"""
+
+    __slots__ = ("snap", "name", "kinds", "start", "end", "columns")
+
+    def __init__(self, snap, name, spec, start, end):
+        self.snap = snap
+        self.name = name
+        self.kinds = dict(spec)
+        self.start = start
+        self.end = end
+        self.columns = {}
+
+    def column(self, sub):
+        c = self.columns.get(sub)
+        if c is None:
+            raw = self.snap.col(f"rec.{self.name}.{sub}")[self.start:self.end].tolist()
+            c = self.columns[sub] = self.snap._decode_many(self.kinds[sub], raw)
+        return c
+
+    def all_columns(self):
+        """整条记录都要的时候 (遍历 values / items)：各子字段的列，按 kinds 的顺序"""
+        cols = self.columns.get(None)
+        if cols is None:
+            cols = self.columns[None] = [self.column(sub) for sub in self.kinds]
+        return cols
+
+
+class SnapshotRecord(Mapping):
+    """记录字段里的一条 (一章 / 一条评论)：像只读的 dict，读哪个子字段才解码哪个"""
+
+    __slots__ = ("_block", "_j")
+
+    def __init__(self, block, j):
+        self._block = block
+        self._j = j
+
+    def __getitem__(self, key):
+        if key not in self._block.kinds:
+            raise KeyError(key)
+        return self._block.column(key)[self._j]
+
+    def get(self, key, default=None):
+        if key not in self._block.kinds:
+            return default
+        return self._block.column(key)[self._j]
+
+    def __contains__(self, key):
+        return key in self._block.kinds
+
+    def values(self):
+        j = self._j
+        return [c[j] for c in self._block.all_columns()]
+
+    def items(self):
+        return list(zip(self._block.kinds, self.values()))
+
+    def __iter__(self):
+        return iter(self._block.kinds)
+
+    def __len__(self):
+        return len(self._block.kinds)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def load_snapshot(json_path):
+    """json_path 旁边有最新的快照就打开它，返回 DB；没有或过期返回 None"""
+    path = snapshot_path(json_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        snap = Snapshot(path)
+    except (OSError, ValueError):
+        return None
+    if not snap.is_fresh(json_path):
+        return None
+    return snap.data()
+
+
+if __name__ == "__main__":
+    for p in sys.argv[1:] or ["my_ao3_db.json"]:
+        print(f"📦 {p} -> {convert(p)}")
@@ -0,0 +1,174 @@
+import argparse
+import json
+import random
+from datetime import date, timedelta
+
+# 合成数据：生成和 ao3_fetch.py 输出格式一致的 DB，用来给 ao3_analyze.py 做压力测试/基准。
+#   python ao3_synth.py --works 500 --comments 80 -o synth_db.json
+
+RATINGS = ["General Audiences", "Teen And Up Audiences", "Mature", "Explicit", "Not Rated"]
+CATEGORIES = ["M/M", "F/F", "F/M", "Gen", "Multi", "Other"]
+COLLECTIONS = ["Yuletide 2025", "Rarepair Exchange", "中文同人合集", "Drabble Challenge", "Big Bang 2025"]
+WORDS = "the archive keeps every word you wrote this year and every reader who stopped by".split()
+
+
+def make_db(works=200, username="synth_writer", seed=2025, year=2025, max_chapters=20,
+            serial_share=0.4, comments_per_work=40, kudos_per_work=80, readers=500,
+            fandoms=8, characters=40, relationships=30, freeforms=120, tags_per_work=6,
+            anon_share=0.1, hidden_share=0.05, reply_share=0.5, guest_share=0.1):
+    """生成一份合成 DB (dict)
+
+    标签数量 (fandoms / relationships / freeforms) 控制标签基数；
+    关系标签会故意混入 A/B 与 B/A、全角斜杠等写法，模拟 AO3 上的重复。
+    """
+    rng = random.Random(seed)
+    reader_names = [f"reader{i:04d}" for i in range(readers)]
+    fandom_names = [f"Fandom {i}" for i in range(fandoms)]
+    char_names = [f"Character {i}" for i in range(characters)]
+    rel_names = []
+    for _ in range(relationships):
+        a, b = rng.sample(char_names, 2)
+        rel_names.append(f"{a}/{b}")
+    freeform_names = [f"Tag {i}" for i in range(freeforms)]
+
+    def variant(rel):
+        # 同一个关系的不同写法
+        a, b = rel.split("/", 1)
+        r = rng.random()
+        if r < 0.15:
+            return f"{b}/{a}"
+        if r < 0.2:
+            return f"{a}／{b}"
+        return rel
+
+    comment_id = 10_000_000
+    start = date(year, 1, 1)
+    db_works = []
+    for n in range(works):
+        wid = str(60_000_000 + n)
+        serial = rng.random() < serial_share
+        n_chapters = rng.randint(2, max_chapters) if serial else 1
+        first = start + timedelta(days=rng.randint(0, 330))
+        chapters_detail = []
+        day = first
+        for c in range(1, n_chapters + 1):
+            chapters_detail.append({
+                "chapter_index": c,
+                "chapter_title": f"{c}. Chapter {c}",
+                "publish_date": day.isoformat(),
+            })
+            day += timedelta(days=rng.randint(1, 14))
+        updated = date.fromisoformat(chapters_detail[-1]["publish_date"])
+
+        r = rng.random()
+        w_type = "Anonymous" if r < anon_share else "Unrevealed" if r < anon_share + hidden_share else "Normal"
+
+        n_kudos = min(readers, max(0, int(rng.gauss(kudos_per_work, kudos_per_work / 3))))
+        kudos_givers = rng.sample(reader_names, n_kudos)
+
+        comments_tree = []
+        for _ in range(max(0, int(rng.gauss(comments_per_work, comments_per_work / 3)))):
+            comment_id += 1
+            chapter = rng.randint(1, n_chapters)
+            user = "Guest" if rng.random() < guest_share else rng.choice(reader_names)
+            root = {"id": str(comment_id), "parent_id": None, "user": user,
+                    "chapter_index": chapter, "chapter_name": f"Chapter {chapter}",
+                    "date": "Mon 01 Dec 2025 12:00AM", "text": " ".join(rng.choices(WORDS, k=30))}
+            comments_tree.append(root)
+            parent = root
+            while rng.random() < reply_share:
+                comment_id += 1
+                reply_user = username if parent["user"] != username else root["user"]
+                reply = dict(parent, id=str(comment_id), parent_id=parent["id"], user=reply_user)
+                comments_tree.append(reply)
+                parent = reply
+
+        n_tags = max(1, int(rng.gauss(tags_per_work, tags_per_work / 3)))
+        total = str(n_chapters) if rng.random() < 0.7 else "?"
+        status = "Completed" if total == str(n_chapters) else "In Progress"
+        hits = n_kudos * rng.randint(5, 20)
+        db_works.append({
+            "work_id": wid,
+            "title": f"Synthetic Work {n}",
+            "url": f"/works/{wid}",
+            "work_type": w_type,
+            "rating": rng.choice(RATINGS),
+            "categories": rng.sample(CATEGORIES, rng.randint(1, 2)),
+            "relationships": [variant(x) for x in rng.sample(rel_names, min(len(rel_names), rng.randint(0, 3)))],
+            "freeform_tags": rng.sample(freeform_names, min(len(freeform_names), n_tags)),
+            "status": status,
+            "chapters_text": f"{n_chapters}/{total}",
+            "fandoms": rng.sample(fandom_names, min(len(fandom_names), rng.randint(1, 2))),
+            "words": rng.randint(1500, 6000) * n_chapters,
+            "kudos": n_kudos,
+            "hits": hits,
+            "comments_count": len(comments_tree),
+            "date_updated": updated.strftime("%d %b %Y"),
+            "real_subs": rng.randint(0, n_kudos // 3 + 1) if serial else 0,
+            "real_bookmarks": rng.randint(0, n_kudos // 4 + 1),
+            "chapters_detail": chapters_detail,
+            "first_published": chapters_detail[0]["publish_date"],
+            "kudos_givers": kudos_givers,
+            "comments_tree": comments_tree,
+            "commenters": [{"user": c["user"], "chapter_index": c["chapter_index"]} for c in comments_tree],
+        })
+
+    db_works.sort(key=lambda w: w["chapters_detail"][-1]["publish_date"], reverse=True)
+
+    # 系列和合集 (另一个随机数发生器，不影响上面的作品)
+    rng = random.Random(seed + 1)
+    series_list = []
+    for w in sorted(db_works, key=lambda w: w["first_published"]):
+        w["series"] = []
+        if rng.random() < 0.3:
+            if not series_list or rng.random() < 0.4:
+                series_list.append({"series_id": str(7000 + len(series_list)),
+                                    "title": f"Synthetic Series {len(series_list)}", "works": 0,
+                                    "words": 0, "bookmarks": rng.randint(0, 50), "date_updated": ""})
+                s = series_list[-1]
+            else:
+                s = rng.choice(series_list)
+            s["works"] += 1
+            s["words"] += w["words"]
+            w["series"].append({"series_id": s["series_id"], "title": s["title"], "part": s["works"]})
+        w["series_name"] = w["series"][0]["title"] if w["series"] else None
+        w["series_part"] = w["series"][0]["part"] if w["series"] else None
+        w["collections_info"] = rng.sample(COLLECTIONS, rng.randint(1, 2)) if rng.random() < 0.2 else []
+    return {
+        "account": {"username": username, "fetch_time": f"{year}-12-31T00:00:00"},
+        "works": db_works,
+        "series_list": series_list,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="生成合成的 AO3 DB (格式同 ao3_fetch.py 输出)")
+    ap.add_argument("-o", "--output", default="synth_db.json")
+    ap.add_argument("--works", type=int, default=200)
+    ap.add_argument("--max-chapters", type=int, default=20)
+    ap.add_argument("--serial-share", type=float, default=0.4, help="多章连载的比例")
+    ap.add_argument("--comments", type=int, default=40, help="每篇平均评论串数")
+    ap.add_argument("--kudos", type=int, default=80, help="每篇平均 kudos 数")
+    ap.add_argument("--readers", type=int, default=500, help="读者总数")
+    ap.add_argument("--fandoms", type=int, default=8)
+    ap.add_argument("--relationships", type=int, default=30)
+    ap.add_argument("--freeforms", type=int, default=120)
+    ap.add_argument("--tags-per-work", type=int, default=6)
+    ap.add_argument("--anon-share", type=float, default=0.1)
+    ap.add_argument("--hidden-share", type=float, default=0.05)
+    ap.add_argument("--seed", type=int, default=2025)
+    args = ap.parse_args()
+
+    db = make_db(works=args.works, seed=args.seed, max_chapters=args.max_chapters,
+                 serial_share=args.serial_share, comments_per_work=args.comments,
+                 kudos_per_work=args.kudos, readers=args.readers, fandoms=args.fandoms,
+                 relationships=args.relationships, freeforms=args.freeforms,
+                 tags_per_work=args.tags_per_work, anon_share=args.anon_share,
+                 hidden_share=args.hidden_share)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(db, f, ensure_ascii=False, indent=2)
+    print(f"✅ 已生成 {len(db['works'])} 篇合成作品：{args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import json
+import os
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+# 标签索引：一份数据建一次，之后的查询都在整数 id 上做。
+#   - 每个标签 (按 种类 + 归一后的名字) 一个整数 id
+#   - 关系标签归一：全角斜杠、多余空格、A/B 和 B/A、别名表 (可选)
+#   - 标签两两同时出现在几篇作品里：稀疏存储，只记出现过的组合
+# 多年 / 多个账号的数据可以对同一个索引多次 add_works。
+#
+# 别名表 ao3_tag_aliases.json (可选)：{"别名": "标准写法"}，整条标签或关系里的单个角色名都能写，
+#   {"Wei Ying": "Wei Wuxian", "魏无羡": "Wei Wuxian"}
+
+TAG_KINDS = ("fandoms", "relationships", "freeform_tags")
+ALIAS_FILE = "ao3_tag_aliases.json"
+
+_aliases = {}
+
+
+def load_aliases(path=ALIAS_FILE):
+    """读别名表，返回条数；文件不存在就不用别名"""
+    global _aliases
+    _aliases = {}
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                _aliases = {" ".join(k.split()): " ".join(v.split()) for k, v in json.load(f).items()}
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠️ 别名表 {path} 读不了，先不用别名: {e}")
+    canonical_tag.cache_clear()
+    return len(_aliases)
+
+
+@lru_cache(maxsize=None)
+def canonical_tag(kind, tag):
+    """标签的标准写法 (同一个标签在一份数据里会出现很多次，结果缓存起来)"""
+    t = " ".join(tag.replace("／", "/").replace("＆", "&").split())
+    t = _aliases.get(t, t)
+    if kind != "relationships":
+        return t
+    # 关系标签：A/B 是 CP，A & B 是非 CP，两边各自查别名后按字母排序，B/A 就和 A/B 一样了
+    sep = "/" if "/" in t else " & " if "&" in t else None
+    if sep is None:
+        return t
+    names = [" ".join(n.split()) for n in t.split(sep.strip())]
+    names = sorted((_aliases.get(n, n) for n in names if n), key=str.casefold)
+    return sep.join(names)
+
+
+class TagIndex:
+    """标签 -> 整数 id，外加每个标签的作品数和稀疏的共现计数"""
+
+    def __init__(self):
+        self.ids = {}        # (种类, 标准写法) -> id
+        self.names = []      # id -> 标准写法 (只用来归并，关系标签的顺序已经按字母排过)
+        self.kinds = []      # id -> 种类
+        self.spellings = []  # id -> Counter(原始写法)
+        self.counts = []     # id -> 出现在几篇作品里
+        self.cooc = defaultdict(Counter)  # id -> {另一个 id: 一起出现的作品数}，对称
+        self.n_works = 0
+
+    @classmethod
+    def build(cls, works):
+        index = cls()
+        index.add_works(works)
+        return index
+
+    def intern(self, kind, raw):
+        key = (kind, canonical_tag(kind, raw))
+        tid = self.ids.get(key)
+        if tid is None:
+            tid = self.ids[key] = len(self.names)
+            self.names.append(key[1])
+            self.kinds.append(kind)
+            self.spellings.append(Counter())
+            self.counts.append(0)
+        self.spellings[tid][raw.strip()] += 1
+        return tid
+
+    def add_works(self, works):
+        for w in works:
+            ids = set()
+            for kind in TAG_KINDS:
+                tags = w.get(kind)
+                for raw in tags if isinstance(tags, list) else []:
+                    if isinstance(raw, str) and raw.strip():
+                        ids.add(self.intern(kind, raw))
+            ids = sorted(ids)
+            for i, a in enumerate(ids):
+                self.counts[a] += 1
+                row = self.cooc[a]
+                for b in ids[i + 1:]:
+                    row[b] += 1
+                    self.cooc[b][a] += 1
+            self.n_works += 1
+
+    # ---- 查询 ----
+    def display(self, tid):
+        """给人看的写法：作者最常用的那种 (A/B 的顺序有含义，不能显示成排过序的标准写法)"""
+        return self.spellings[tid].most_common(1)[0][0]
+
+    def top(self, kind, k=5):
+        """某一类里用得最多的 k 个标签：[(标签, 作品数)]"""
+        ranked = sorted((-c, self.names[t], t) for t, c in enumerate(self.counts) if self.kinds[t] == kind)
+        return [(self.display(t), -c) for c, _, t in ranked[:k]]
+
+    def merged(self, kind="relationships"):
+        """归一时被合并的标签：[(最常用的写法, [原来的几种写法])]"""
+        return [(self.display(t), sorted(sp)) for t, sp in enumerate(self.spellings)
+                if self.kinds[t] == kind and len(sp) > 1]
+
+    def pairs(self, min_count=2, kinds=None):
+        """一起出现过至少 min_count 次的标签对：[(a, b, 次数)]，次数多的在前 (a < b，每对只出现一次)"""
+        result = []
+        for a, row in self.cooc.items():
+            if kinds and self.kinds[a] not in kinds:
+                continue
+            for b, c in row.items():
+                if a < b and c >= min_count and (not kinds or self.kinds[b] in kinds):
+                    result.append((a, b, c))
+        result.sort(key=lambda x: (-x[2], x[0], x[1]))
+        return result
+
+    def top_pairs(self, k=5, kinds=None):
+        return [(self.display(a), self.display(b), c) for a, b, c in self.pairs(2, kinds)[:k]]
+
+    def always_together(self, min_count=2, kinds=None):
+        """形影不离的标签：两个标签出现的作品完全一样 (各自的作品数 = 一起出现的作品数)"""
+        return [(self.display(a), self.display(b), c) for a, b, c in self.pairs(min_count, kinds)
+                if self.counts[a] == c == self.counts[b]]
+
+    def clusters(self, min_count=2, min_jaccard=0.5, kinds=None):
+        """常一起用的标签分成几组：两个标签一起出现的作品占它们总作品数的 min_jaccard 以上就连起来，
+        返回各组 [[标签, ...], ...]，大的组在前"""
+        parent = {}
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for a, b, c in self.pairs(min_count, kinds):
+            if c / (self.counts[a] + self.counts[b] - c) >= min_jaccard:
+                parent.setdefault(a, a)
+                parent.setdefault(b, b)
+                ra, rb = find(a), find(b)
+                if ra != rb:
+                    parent[max(ra, rb)] = min(ra, rb)
+        groups = defaultdict(list)
+        for t in parent:
+            groups[find(t)].append(t)
+        result = [sorted(g, key=lambda t: (-self.counts[t], t)) for g in groups.values() if len(g) > 1]
+        result.sort(key=lambda g: (-len(g), -sum(self.counts[t] for t in g)))
+        return [[self.display(t) for t in g] for g in result]
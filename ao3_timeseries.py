@@ -0,0 +1,116 @@
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime
+
+# watch 模式的计数时间序列 (只追加，不改写旧内容)：
+#   第一行是表头 {"format": "ao3-series", "fields": [...]}
+#   之后每次轮询一行 {"t": 时间戳, "w": {work_id: [各字段的增量]}}
+# 每篇作品只在数字有变化时才写，写的是和它上一次记录的差值 (第一次记录就是原值)，
+# 一天看几次也只多几十个字节。读的时候从头累加就能还原任意作品的历史。
+
+SERIES_FORMAT = "ao3-series"
+SERIES_FIELDS = ("kudos", "hits", "comments", "subs", "bookmarks", "chapters")
+
+
+def _read_records(path):
+    """逐行读出记录；最后一行如果只写了一半 (写的时候被中断) 就跳过"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def iter_snapshots(path):
+    """按时间顺序还原每次轮询：yield (时间戳, {work_id: {字段: 数值}})，只含这一次有变化的作品"""
+    fields = SERIES_FIELDS
+    last = {}
+    for rec in _read_records(path):
+        if rec.get("format") == SERIES_FORMAT:
+            fields = tuple(rec.get("fields", SERIES_FIELDS))
+            continue
+        changed = {}
+        for wid, deltas in rec.get("w", {}).items():
+            prev = last.get(wid, [0] * len(fields))
+            cur = [a + b for a, b in zip(prev, deltas)]
+            last[wid] = cur
+            changed[wid] = dict(zip(fields, cur))
+        yield rec.get("t", 0), changed
+
+
+def load_histories(path):
+    """一次读完整个文件：{work_id: [(datetime, {字段: 数值}), ...]}；文件不存在返回 {}"""
+    histories = {}
+    if not os.path.exists(path):
+        return histories
+    for t, changed in iter_snapshots(path):
+        when = datetime.fromtimestamp(t)
+        for wid, values in changed.items():
+            histories.setdefault(wid, []).append((when, values))
+    return histories
+
+
+def work_history(path, work_id):
+    """单篇作品的历史 [(datetime, {字段: 数值}), ...]"""
+    return [(datetime.fromtimestamp(t), changed[work_id])
+            for t, changed in iter_snapshots(path) if work_id in changed]
+
+
+def monthly_gain(history, field="kudos"):
+    """相邻两次记录之间的增长按月累计：{"2025-03": 120, ...}
+
+    第一次记录只当起点 (开始监测之前攒下的数不知道是哪个月涨的)，增长算在后一次记录的月份。
+    """
+    gains = Counter()
+    for (_, before), (when, after) in zip(history, history[1:]):
+        diff = after.get(field, 0) - before.get(field, 0)
+        if diff:
+            gains[when.strftime("%Y-%m")] += diff
+    return dict(gains)
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class SeriesWriter:
+    """追加写时间序列：打开时从文件还原每篇作品最后一次的数值，之后只写差值"""
+
+    def __init__(self, path):
+        self.path = path
+        self.last = {}
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            for _, changed in iter_snapshots(path):
+                for wid, values in changed.items():
+                    self.last[wid] = [values.get(k, 0) for k in SERIES_FIELDS]
+            if not _ends_with_newline(path):
+                # 上次写到一半被中断：另起一行，坏掉的那行读的时候会被跳过
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("\n")
+        else:
+            self._write_line({"format": SERIES_FORMAT, "version": 1, "fields": list(SERIES_FIELDS)})
+
+    def _write_line(self, rec):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def append(self, snapshot, t=None):
+        """记一次轮询 snapshot = {work_id: {字段: 数值}}，返回有变化的作品数"""
+        deltas = {}
+        for wid, values in snapshot.items():
+            cur = [int(values.get(k, 0) or 0) for k in SERIES_FIELDS]
+            prev = self.last.get(wid)
+            delta = cur if prev is None else [a - b for a, b in zip(cur, prev)]
+            if prev is None or any(delta):
+                deltas[wid] = delta
+                self.last[wid] = cur
+        self._write_line({"t": int(time.time() if t is None else t), "w": deltas})
+        return len(deltas)
@@ -0,0 +1,123 @@
+import argparse
+import sys
+
+# 统一入口：打包成一个 exe 时也用它。
+#   python ao3report.py fetch          登录并完整抓取 (需要 Playwright)
+#   python ao3report.py fetch --retry-failed   只重抓上次失败的作品 (DB 里的 failed_works)
+#   python ao3report.py refresh        只更新计数，有变化的作品才重新深度抓取
+#   python ao3report.py multi [ao3_accounts.json]   多个账号同时抓 (一个浏览器，每个账号一个 context)
+#   python ao3report.py watch          定时只看 Stats 和作品列表，把计数追加进时间序列 (--once 只看一次)
+#   python ao3report.py analyze        读 .json 生成年度报告 (不加载 Playwright / BeautifulSoup)
+#   python ao3report.py snapshot [db.json ...]   把已有的 .json 转成分析用的列式快照 .snap
+#   python ao3report.py bench ...      性能基准，参数同 ao3_bench.py
+# 这里只 import 标准库；各子命令要用的模块在各自的函数里再导入，分析时启动更快。
+# 所有子命令共用一个 --data：抓取写到哪个 DB，分析就读哪个。
+
+
+def use_data(module, args):
+    if args.data:
+        module.DATA_FILE = args.data
+
+
+def cmd_fetch(args):
+    import ao3_fetch
+    use_data(ao3_fetch, args)
+    ao3_fetch.main("retry_failed" if args.retry_failed else "fetch")
+    return 0
+
+
+def cmd_refresh(args):
+    import ao3_fetch
+    use_data(ao3_fetch, args)
+    ao3_fetch.main("refresh")
+    return 0
+
+
+def cmd_multi(args):
+    import ao3_multi
+    return ao3_multi.main(args.accounts)
+
+
+def cmd_watch(args):
+    import ao3_fetch
+    use_data(ao3_fetch, args)
+    if args.interval_hours:
+        ao3_fetch.WATCH_INTERVAL_HOURS = args.interval_hours
+    ao3_fetch.main("watch", once=args.once)
+    return 0
+
+
+def cmd_analyze(args):
+    import ao3_analyze
+    use_data(ao3_analyze, args)
+    if args.fast:
+        ao3_analyze.PRINT_DELAY = 0
+    ao3_analyze.main()
+    return 0
+
+
+def cmd_snapshot(args):
+    import ao3_snapshot
+    import ao3_analyze
+    use_data(ao3_analyze, args)
+    for path in args.files or [ao3_analyze.DATA_FILE]:
+        print(f"📦 {path} -> {ao3_snapshot.convert(path)}")
+    return 0
+
+
+def cmd_bench(args):
+    import ao3_bench
+    return ao3_bench.main(args.bench_args)
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog="ao3report", description="AO3 年度总结")
+    sub = ap.add_subparsers(dest="command")
+    data = argparse.ArgumentParser(add_help=False)
+    data.add_argument("--data", default=None, help="数据文件 (默认 my_ao3_db.json，各子命令共用)")
+
+    fp = sub.add_parser("fetch", parents=[data], help="登录 AO3 并抓取全部作品数据")
+    fp.add_argument("--retry-failed", action="store_true", help="只重抓上次记在 failed_works 里的作品")
+    fp.set_defaults(func=cmd_fetch)
+
+    rp = sub.add_parser("refresh", parents=[data], help="在已有数据上刷新：只重新抓有变化的作品")
+    rp.set_defaults(func=cmd_refresh)
+
+    mp = sub.add_parser("multi", help="多个账号同时抓取，每个账号单独的登录状态和数据文件")
+    mp.add_argument("accounts", nargs="?", default=None, help="账号列表 (默认 ao3_accounts.json)")
+    mp.set_defaults(func=cmd_multi)
+
+    wp = sub.add_parser("watch", parents=[data], help="定时记录各作品的 kudos/hits/评论/订阅/收藏，不做深度抓取")
+    wp.add_argument("--once", action="store_true", help="只看一次就退出 (配合系统的定时任务)")
+    wp.add_argument("--interval-hours", type=float, default=None, help="每隔几小时看一次 (默认 6)")
+    wp.set_defaults(func=cmd_watch)
+
+    ap_ = sub.add_parser("analyze", parents=[data], help="读取抓到的 .json 生成年度报告")
+    ap_.add_argument("--fast", action="store_true", help="不逐行停顿")
+    ap_.set_defaults(func=cmd_analyze)
+
+    sp = sub.add_parser("snapshot", parents=[data], help="把 .json 转成列式快照，分析时秒开 (抓取保存时会自动生成)")
+    sp.add_argument("files", nargs="*", help="数据文件 (默认 --data 或 my_ao3_db.json)")
+    sp.set_defaults(func=cmd_snapshot)
+
+    bp = sub.add_parser("bench", help="性能基准 (fetch / analyze / startup)", add_help=False)
+    bp.add_argument("bench_args", nargs=argparse.REMAINDER)
+    bp.set_defaults(func=cmd_bench)
+    return ap
+
+
+def main(argv=None):
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    if args.command is None:
+        # 双击 exe 时没有参数：沿用以前的流程，先问要做什么
+        print("1. 抓取数据 (fetch)\n2. 刷新数据 (refresh)\n3. 生成报告 (analyze)")
+        choice = input("请选择 [3]: ").strip() or "3"
+        args = ap.parse_args([{"1": "fetch", "2": "refresh"}.get(choice, "analyze")])
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # 打包成 exe 后解析进程池的子进程需要
+    sys.exit(main())